@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the "any_subdirectory" venv finder's directory scan against the previous implementation.
+
+The previous implementation tried every (entry, venv type) pair with `Path.resolve()` and `is_file`/`is_dir` checks.
+The current one scans the directory once with `os.scandir` and only validates entries which have a venv marker.
+
+Both are run against a synthetic monorepo-like tree with 10k entries and must find the same venv.
+
+Usage: python3 benchmarks/bench_any_subdirectory.py [--entries 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from types import ModuleType
+
+PROJECT_ROOT = Path(__file__).parents[1]
+
+MARKER_NAMES = ("pyvenv.cfg", "conda-meta")
+"""Venv markers in the order of `list_venv_info_classes()`."""
+
+IGNORES = frozenset((
+    ".git",
+    ".hg",
+    ".svn",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    "__pycache__",
+    "node_modules",
+))
+
+
+def load_module(name: str, path: Path) -> ModuleType:
+    """Loads a module from the file without importing the `plugin` package, which requires Sublime Text."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def python_executable(venv_dir: Path) -> Path:
+    return venv_dir / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+
+
+def is_valid_venv(venv_dir: Path, marker_name: str) -> bool:
+    """Same checks as `BaseVenvInfo.is_valid()`."""
+    marker = venv_dir / marker_name
+    is_marker_valid = marker.is_dir() if marker_name == "conda-meta" else marker.is_file()
+    return python_executable(venv_dir).is_file() and is_marker_valid
+
+
+def legacy_find_venv(project_dir: Path) -> Path | None:
+    """The previous implementation, i.e., `product(project_dir.iterdir(), list_venv_info_classes())`."""
+    for subproject_dir in project_dir.iterdir():
+        for marker_name in MARKER_NAMES:
+            venv_dir = subproject_dir.expanduser().resolve()
+            if is_valid_venv(venv_dir, marker_name):
+                return venv_dir
+    return None
+
+
+def current_find_venv(utils: ModuleType, project_dir: Path, *, max_entries: int = 0) -> Path | None:
+    """The current implementation of `AnySubdirectoryVenvFinder.find_venv_()`."""
+    for entry in utils.scan_subdirectories(project_dir, ignores=IGNORES, max_entries=max_entries):
+        for marker_name in MARKER_NAMES:
+            if os.path.exists(os.path.join(entry.path, marker_name)):
+                venv_dir = Path(entry.path).expanduser().resolve()
+                if is_valid_venv(venv_dir, marker_name):
+                    return venv_dir
+    return None
+
+
+def build_tree(root: Path, entries: int) -> None:
+    """Builds a monorepo-like tree: many packages and files and some heavy directories."""
+    (root / "node_modules").mkdir()
+    for i in range(1000):
+        (root / "node_modules" / f"pkg_{i}").mkdir()
+    for i in range(entries - 1):
+        if i % 2:
+            (root / f"file_{i}.txt").touch()
+        else:
+            (package := root / f"package_{i}").mkdir()
+            (package / "pyproject.toml").touch()
+
+
+def create_venv(venv_dir: Path) -> Path:
+    python_executable(venv_dir).parent.mkdir(parents=True)
+    python_executable(venv_dir).touch()
+    (venv_dir / "pyvenv.cfg").write_text("version = 3.8.0\n")
+    return venv_dir.resolve()
+
+
+def bench(title: str, utils: ModuleType, root: Path, expected: Path | None) -> bool:
+    if legacy_find_venv(root) != expected or current_find_venv(utils, root) != expected:
+        print(f"[{title}] Implementations don't find the expected venv: {expected}")
+        return False
+
+    legacy = min(timeit.repeat(lambda: legacy_find_venv(root), number=1, repeat=5))
+    current = min(timeit.repeat(lambda: current_find_venv(utils, root), number=1, repeat=5))
+    bounded = min(timeit.repeat(lambda: current_find_venv(utils, root, max_entries=5000), number=1, repeat=5))
+    print(f"[{title}]")
+    print(f"{'implementation':<28} {'time (ms)':>10} {'speedup':>8}")
+    print(f"{'legacy':<28} {legacy * 1e3:>10.2f} {1:>7.2f}x")
+    print(f"{'current':<28} {current * 1e3:>10.2f} {legacy / current:>7.2f}x")
+    print(f"{'current (max entries 5000)':<28} {bounded * 1e3:>10.2f} {legacy / bounded:>7.2f}x")
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    utils = load_module("utils", PROJECT_ROOT / "plugin/utils.py")
+    root = Path(tempfile.mkdtemp(prefix="bench_any_subdirectory_"))
+    try:
+        build_tree(root, args.entries)
+        print(f"entries: {args.entries}")
+        # the common case: "any_subdirectory" is the last strategy and there is no venv at all
+        if not bench("no venv", utils, root, None):
+            return 1
+        if not bench("with venv", utils, root, create_venv(root / "venv_for_benchmark")):
+            return 1
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark of `boot.py`, i.e., the cost of loading the plugin when ST starts or reloads it.
+
+`boot.py` is imported in a fresh interpreter with `-X importtime` against the stand-ins in `benchmarks/standins`.
+The stand-ins are imported beforehand, like ST and LSP have been loaded in the plugin host,
+so the numbers cover the plugin and its third-party dependencies only.
+Standard library modules which the harness and the stand-ins import are not counted either.
+
+The median of the cumulative import time of `boot.py` is reported along with the heaviest packages and modules.
+With `--baseline`, the result is compared with a previous JSON output and the exit code is 1 if it's slower than
+the tolerance.
+
+Usage: python3 benchmarks/bench_import_time.py [--repeat 5] [--top 15] [--output FILE] [--baseline FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).parent
+BOOT_MODULE = "lsp_pyright.boot"
+
+CHILD_CODE = f"""
+import sys
+sys.path.insert(0, {str(BENCHMARKS_DIR)!r})
+from harness import install_standins
+install_standins(plugin_init=True)
+import LSP.plugin, LSP.plugin.core.constants, LSP.protocol, lsp_utils, sublime, sublime_lib, sublime_plugin
+import {BOOT_MODULE}
+"""
+
+
+def run_importtime() -> dict[str, int]:
+    """Imports `boot.py` in a fresh interpreter. Returns `{module: self time in us}` of modules imported by it."""
+    proc = subprocess.run(
+        (sys.executable, "-X", "importtime", "-c", CHILD_CODE),
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    # lines are "import time: <self> | <cumulative> | <indentation><module>" and a module is printed after
+    # the modules it imports, which are more indented
+    entries: list[tuple[int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        entries.append((len(name) - len(name.lstrip()), int(self_us), name.strip()))
+
+    boot_index = next(i for i, (_, _, name) in enumerate(entries) if name == BOOT_MODULE)
+    boot_level = entries[boot_index][0]
+    modules = {BOOT_MODULE: entries[boot_index][1]}
+    for level, self_us, name in reversed(entries[:boot_index]):
+        if level <= boot_level:
+            break
+        modules[name] = self_us
+    return modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="The number of fresh interpreters to run.")
+    parser.add_argument("--top", type=int, default=15, help="The number of the heaviest modules to show.")
+    parser.add_argument("--output", type=Path, help="Write the result as JSON to the file.")
+    parser.add_argument("--baseline", type=Path, help="A previous JSON output to compare the result with.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown ratio against the baseline.")
+    args = parser.parse_args()
+
+    runs = [run_importtime() for _ in range(args.repeat)]
+    total_us = statistics.median(sum(modules.values()) for modules in runs)
+    module_us = {name: statistics.median(modules.get(name, 0) for modules in runs) for name in runs[-1]}
+    package_us: defaultdict[str, float] = defaultdict(float)
+    for name, self_us in module_us.items():
+        package_us[name.partition(".")[0]] += self_us
+
+    print(f"Cumulative import time of {BOOT_MODULE}: {total_us / 1e3:.1f} ms (median of {args.repeat} runs)")
+    print(f"Imported modules: {len(module_us)}\n")
+    print(f"{'package':<40} {'self (ms)':>10}")
+    for name, self_us in sorted(package_us.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{name:<40} {self_us / 1e3:>10.2f}")
+    print(f"\n{'module':<40} {'self (ms)':>10}")
+    for name, self_us in sorted(module_us.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{name:<40} {self_us / 1e3:>10.2f}")
+
+    if args.output:
+        report = {"total_us": total_us, "packages_us": package_us, "modules_us": module_us}
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        previous = json.loads(args.baseline.read_text(encoding="utf-8"))["total_us"]
+        if total_us > previous * (1 + args.tolerance):
+            print(f"\nRegression: {previous / 1e3:.1f} ms -> {total_us / 1e3:.1f} ms ({total_us / previous:.2f}x)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
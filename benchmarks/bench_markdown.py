@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of `plugin/markdown.py` against the previous implementation, which applied rules one by one.
+
+Samples are real (and large) docstrings from the standard library, formatted like pyright hover contents.
+The output is checked against responses recorded from the server by `tests/test_markdown.py` instead.
+
+Usage: python3 benchmarks/bench_markdown.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import decimal
+import importlib.util
+import inspect
+import re
+import subprocess
+import sys
+import timeit
+import typing
+from pathlib import Path
+from types import ModuleType
+
+PROJECT_ROOT = Path(__file__).parents[1]
+
+REST_DOCSTRING = """
+Send a request to the server.
+
+:param method: The HTTP method, e.g., ``GET``.
+:param url: The URL of the \\_resource\\_.
+:type url: str
+:param \\*\\*kwargs: Optional arguments that ``request`` takes.
+:returns: The response object.
+:rtype: requests.Response
+:raises ValueError: If the URL is invalid.
+:deprecated: Use ``Session.request`` instead.
+"""
+
+
+def load_module(name: str, path: Path) -> ModuleType:
+    """Loads a module from the file without importing the `plugin` package, which requires Sublime Text."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_patch_markdown_content(content: str) -> str:
+    """The previous implementation, which is timed as the baseline."""
+    content = re.sub("```python(?=\n)", "```pyright_python", content)
+    content = re.sub("```\n---", "```\n\n---", content)
+    content = re.sub(
+        r"\n:(\w+)[ \t]+([\w\\*.]+):",
+        lambda m: "\n__{field}:__ `{name}`".format(
+            field=m.group(1).title(),
+            name=m.group(2).replace(R"\_", "_").replace(R"\*", "*"),
+        ),
+        content,
+    )
+    content = re.sub(r"\n:returns?:", r"\n__Returns:__", content)
+    content = re.sub(r"\n:rtype:", r"\n__Returntype:__", content)
+    content = re.sub(r"\n:deprecated:", r"\n⚠️ __Deprecated:__", content)
+    return content
+
+
+def to_hover_markdown(signature: str, docstring: str) -> str:
+    """Formats the docstring like how pyright does for a hover response."""
+    docstring = docstring.replace("_", R"\_").replace("*", R"\*")
+    return f"```python\n{signature}\n```\n---\n{docstring}"
+
+
+def build_samples() -> dict[str, str]:
+    samples = {
+        "small": to_hover_markdown("(function) def len(obj: Sized, /) -> int", inspect.getdoc(len) or ""),
+        "rest_fields": to_hover_markdown("(function) def request(method: str, url: str) -> Response", REST_DOCSTRING),
+    }
+    for module in (argparse, collections, decimal, subprocess, typing):
+        samples[f"module_{module.__name__}"] = to_hover_markdown(f"(module) {module.__name__}", module.__doc__ or "")
+    # something as large as pandas/numpy docstrings
+    samples["huge"] = "\n".join(
+        to_hover_markdown(f"(class) {name}", (inspect.getdoc(obj) or "") + REST_DOCSTRING)
+        for module in (argparse, collections, decimal, subprocess, typing)
+        for name, obj in vars(module).items()
+        if not name.startswith("_") and (inspect.isclass(obj) or inspect.isfunction(obj))
+    )
+    return samples
+
+
+def main() -> int:
+    markdown = load_module("markdown", PROJECT_ROOT / "plugin/markdown.py")
+    samples = build_samples()
+
+    print(f"{'sample':<20} {'size':>10} {'legacy (us)':>12} {'current (us)':>13} {'speedup':>8}")
+    for name, content in samples.items():
+        number = max(1, 200_000 // len(content))
+        legacy = min(timeit.repeat(lambda: legacy_patch_markdown_content(content), number=number, repeat=5))
+        current = min(timeit.repeat(lambda: markdown.patch_markdown_content(content), number=number, repeat=5))
+        print(
+            f"{name:<20} {len(content):>10} {legacy / number * 1e6:>12.1f} {current / number * 1e6:>13.1f}"
+            f" {legacy / current:>7.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Helpers to run plugin code under plain CPython, i.e., without Sublime Text.
+
+`install_standins()` puts the stand-in modules in `benchmarks/standins` (`sublime`, `sublime_plugin`, `LSP.plugin`,
+`lsp_utils`, ...) on `sys.path` and registers the plugin package without executing `plugin/__init__.py`,
+which would register the plugin to LSP.
+"""
+
+from __future__ import annotations
+
+import importlib
+import statistics
+import sys
+import timeit
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+PROJECT_ROOT = Path(__file__).parents[1]
+STANDINS_DIR = Path(__file__).parent / "standins"
+PLUGIN_PACKAGE = "lsp_pyright"
+"""The package name which the plugin is imported as. It's the directory name in the `Packages` directory in ST."""
+
+
+def install_standins(*, plugin_init: bool = False) -> None:
+    """If `plugin_init` is `True`, `plugin/__init__.py` is executed when the `plugin` package is imported."""
+    if str(STANDINS_DIR) not in sys.path:
+        sys.path.insert(0, str(STANDINS_DIR))
+    packages = [(PLUGIN_PACKAGE, PROJECT_ROOT)]
+    if not plugin_init:
+        packages.append((f"{PLUGIN_PACKAGE}.plugin", PROJECT_ROOT / "plugin"))
+    for name, path in packages:
+        if name not in sys.modules:
+            package = ModuleType(name)
+            package.__path__ = [str(path)]
+            package.__package__ = name
+            sys.modules[name] = package
+
+
+def import_plugin_module(name: str) -> ModuleType:
+    """Imports a module under the `plugin` directory. E.g., `import_plugin_module("virtual_env.venv_finder")`."""
+    install_standins()
+    return importlib.import_module(f"{PLUGIN_PACKAGE}.plugin.{name}")
+
+
+@dataclass
+class BenchmarkResult:
+    suite: str
+    """The name of the benchmark suite."""
+    name: str
+    """The name of the benchmark case in the suite."""
+    number: int
+    """The number of calls per timing."""
+    repeat: int
+    """The number of timings."""
+    best: float
+    """The best time per call in seconds."""
+    median: float
+    """The median time per call in seconds."""
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def measure(
+    suite: str, name: str, func: Callable[[], Any], *, repeat: int = 5, min_time: float = 0.2
+) -> BenchmarkResult:
+    """Times `func` like `python -m timeit`, i.e., the number of calls per timing is decided automatically."""
+    timer = timeit.Timer(func)
+    number = 1
+    while (elapsed := timer.timeit(number)) < min_time and number < 1_000_000:
+        number *= 10 if elapsed < min_time / 10 else 2
+    timings = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return BenchmarkResult(
+        suite=suite,
+        name=name,
+        number=number,
+        repeat=repeat,
+        best=min(timings),
+        median=statistics.median(timings),
+    )
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Headless benchmark suite of the plugin's hot paths, which runs under plain CPython.
+
+Suites:
+
+- `venv_finders`: every venv finder against synthetic projects. CLI-based finders run fake tools put on `PATH`.
+- `markdown`: `patch_markdown_content` and `patch_documentation` on docstrings formatted like pyright hover contents.
+- `configuration_proxy`: `ConfigurationProxy` get/set and `ConfigurationTransformer` on a pyright configuration.
+- `workspace_folder`: `find_workspace_folder` with many workspace folders.
+
+Results are printed as a table and can be written as JSON with `--output`. With `--baseline`, results are compared
+with a previous JSON output and the exit code is 1 if any case is slower than the tolerance.
+
+Usage: python3 benchmarks/run_suite.py [--suite NAME ...] [--output FILE] [--baseline FILE] [--tolerance 0.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import stat
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Tuple
+
+from harness import BenchmarkResult, import_plugin_module, install_standins, measure
+
+install_standins()
+
+import sublime  # noqa: E402
+from LSP.plugin import Session  # noqa: E402
+
+BenchmarkCase = Tuple[str, Callable[[], Any]]
+"""(name, function to be timed)"""
+
+SUITES: dict[str, Callable[[Path], Iterable[BenchmarkCase]]] = {}
+
+
+def suite(
+    name: str,
+) -> Callable[[Callable[[Path], Iterable[BenchmarkCase]]], Callable[[Path], Iterable[BenchmarkCase]]]:
+    def decorator(func: Callable[[Path], Iterable[BenchmarkCase]]) -> Callable[[Path], Iterable[BenchmarkCase]]:
+        SUITES[name] = func
+        return func
+
+    return decorator
+
+
+# -------- #
+# fixtures #
+# -------- #
+
+
+def create_venv(venv_dir: Path, python_version: str = "3.12.1") -> Path:
+    python_executable = venv_dir / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+    python_executable.parent.mkdir(parents=True, exist_ok=True)
+    python_executable.touch()
+    (venv_dir / "pyvenv.cfg").write_text(f"home = /usr/bin\nversion = {python_version}\n", encoding="utf-8")
+    return venv_dir.resolve()
+
+
+def create_fake_tool(bin_dir: Path, name: str, stdout: str) -> None:
+    """Creates a fake CLI tool which prints `stdout` regardless of arguments."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    if os.name == "nt":
+        (bin_dir / f"{name}.bat").write_text(f"@echo off\r\necho {stdout}\r\n", encoding="utf-8")
+    else:
+        script = bin_dir / name
+        script.write_text(f"#!/bin/sh\necho '{stdout}'\n", encoding="utf-8")
+        script.chmod(script.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+@contextmanager
+def prepend_path(path: Path) -> Generator[None, None, None]:
+    original = os.environ.get("PATH", "")
+    os.environ["PATH"] = f"{path}{os.pathsep}{original}"
+    try:
+        yield
+    finally:
+        os.environ["PATH"] = original
+
+
+# ------ #
+# suites #
+# ------ #
+
+
+@suite("venv_finders")
+def bench_venv_finders(tmp_dir: Path) -> Iterable[BenchmarkCase]:
+    venv_finder = import_plugin_module("virtual_env.venv_finder")
+    helpers = import_plugin_module("virtual_env.helpers")
+    venv_cache = import_plugin_module("virtual_env.venv_cache")
+
+    venv_dir = create_venv(tmp_dir / "venvs" / "shared")
+    python_executable = venv_dir / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+    bin_dir = tmp_dir / "bin"
+    create_fake_tool(bin_dir, "hatch", str(venv_dir))
+    create_fake_tool(bin_dir, "pdm", str(python_executable))
+    create_fake_tool(bin_dir, "pipenv", str(python_executable))
+    create_fake_tool(bin_dir, "poetry", str(venv_dir))
+    create_fake_tool(bin_dir, "pyenv", str(python_executable))
+    create_fake_tool(bin_dir, "rye", f"venv: {venv_dir}")
+
+    # finder name => (project files, expected venv dir)
+    projects: dict[str, tuple[tuple[str, ...], Path]] = {
+        "st_project_data": ((), venv_dir),
+        "local_dot_venv": ((), tmp_dir / "projects" / "local_dot_venv" / ".venv"),
+        "hatch": (("pyproject.toml",), venv_dir),
+        "pdm": (("pyproject.toml", ".pdm-python"), venv_dir),
+        "pipenv": (("Pipfile",), venv_dir),
+        "poetry": (("pyproject.toml", "poetry.lock"), venv_dir),
+        "pyenv": ((".python-version",), venv_dir),
+        "rye": (("pyproject.toml",), venv_dir),
+    }
+    session = Session(window=sublime.Window(project_data={"virtualenv": str(venv_dir)}))
+
+    def make_case(finder_name: str, project_dir: Path, expected: Path) -> Callable[[], Any]:
+        finder_cls = venv_finder.find_finder_class_by_name(finder_name)
+        assert finder_cls
+
+        def find_venv() -> Any:
+            venv_finder.PyenvVenvFinder.result_caches.clear()
+            return finder_cls(project_dir=project_dir, session=session).find_venv()
+
+        # make sure the benchmark measures a successful detection
+        if not (venv_info := find_venv()) or venv_info.venv_dir != expected.resolve():
+            raise RuntimeError(f'Finder "{finder_name}" failed to find the venv: {venv_info}')
+        return find_venv
+
+    # cases are timed while this generator is suspended so fake tools are on `PATH` until the last case finishes
+    with prepend_path(bin_dir):
+        for finder_name, (files, expected) in projects.items():
+            project_dir = tmp_dir / "projects" / finder_name
+            project_dir.mkdir(parents=True)
+            for file in files:
+                (project_dir / file).write_text("3.12.1\n" if file == ".python-version" else "", encoding="utf-8")
+            if finder_name == "local_dot_venv":
+                create_venv(expected)
+            yield finder_name, make_case(finder_name, project_dir, expected)
+
+        # a monorepo-like project which has many entries and the venv in a subdirectory
+        monorepo_dir = tmp_dir / "projects" / "any_subdirectory"
+        (monorepo_dir / "node_modules").mkdir(parents=True)
+        for i in range(5000):
+            (monorepo_dir / f"package_{i}").mkdir()
+            (monorepo_dir / f"file_{i}.txt").touch()
+        monorepo_venv_dir = create_venv(monorepo_dir / "env")
+        yield "any_subdirectory (10k entries)", make_case("any_subdirectory", monorepo_dir, monorepo_venv_dir)
+
+        # the default strategies in order (the first CLI-based finder wins since fake tools ignore projects)
+        strategies = [
+            finder_name for finder_name in venv_finder.get_finder_name_mapping() if finder_name != "st_project_data"
+        ]
+        cache = venv_cache.VenvCache(tmp_dir / "caches" / "venv.json")
+
+        def find_by_strategies(use_cache: bool) -> Callable[[], Any]:
+            def func() -> Any:
+                return helpers.find_venv_by_finder_names(
+                    strategies,
+                    session=session,
+                    project_dir=monorepo_dir,
+                    cache=cache if use_cache else None,
+                )
+
+            return func
+
+        yield "all strategies (monorepo)", find_by_strategies(False)
+        yield "all strategies (monorepo, cached)", find_by_strategies(True)
+
+
+@suite("markdown")
+def bench_markdown(tmp_dir: Path) -> Iterable[BenchmarkCase]:
+    from bench_markdown import build_samples
+
+    markdown = import_plugin_module("markdown")
+    cache = markdown.MarkdownCache()
+    for name, content in build_samples().items():
+        yield name, lambda content=content: markdown.patch_markdown_content(content)
+        cache.patch(content)
+        yield f"{name} (cached)", lambda content=content: cache.patch(content)
+
+    # documentation of some libraries (e.g., pandas) is hundreds of KB
+    huge_content = "\n\n".join(build_samples().values()) * 4
+    yield "huge (no size limit)", lambda: markdown.patch_markdown_content(huge_content)
+    yield "huge (size limit: 20000)", lambda: markdown.patch_documentation(huge_content, size_limit=20000)
+
+
+@suite("configuration_proxy")
+def bench_configuration_proxy(tmp_dir: Path) -> Iterable[BenchmarkCase]:
+    utils_lsp = import_plugin_module("utils_lsp")
+
+    def make_configuration() -> dict[str, Any]:
+        return {
+            "analysis": {
+                "autoImportCompletions": True,
+                "autoSearchPaths": True,
+                "diagnosticMode": "openFilesOnly",
+                "diagnosticSeverityOverrides": {f"report{i}": "warning" for i in range(80)},
+                "extraPaths": [f"/opt/libs/lib_{i}" for i in range(20)],
+                "logLevel": "Information",
+                "stubPath": "typings",
+                "typeCheckingMode": "standard",
+                "useLibraryCodeForTypes": True,
+            },
+            "pythonPath": "",
+            "venvPath": "",
+        }
+
+    python_proxy = utils_lsp.ConfigurationProxy(make_configuration(), utils_lsp.ConfigurationSection("python"))
+    analysis_proxy = utils_lsp.ConfigurationProxy(
+        make_configuration()["analysis"],
+        utils_lsp.ConfigurationSection("python.analysis"),
+    )
+
+    yield "get (python section)", lambda: python_proxy.get("python.analysis.extraPaths")
+    yield "get (python.analysis section)", lambda: analysis_proxy.get("python.analysis.extraPaths")
+    yield "get (outside of section)", lambda: analysis_proxy.get("python.pythonPath")
+    yield "set (existing key)", lambda: python_proxy.set("python.pythonPath", "/usr/bin/python3")
+    yield "set (new nested key)", lambda: python_proxy.set("python.analysis.inlayHints.variableTypes", True)
+
+    configuration_transformer = import_plugin_module("configuration_transformer")
+    transformer = configuration_transformer.ConfigurationTransformer()
+    transformer.register("python", lambda proxy, item, context: proxy.set("python.pythonPath", "/usr/bin/python3"))
+    transformer.register(
+        "python.analysis.extraPaths", lambda proxy, item, context: proxy.get("python.analysis.extraPaths")
+    )
+    transformer.register("python.analysis.stubPath", lambda proxy, item, context: proxy.pop("python.analysis.stubPath"))
+    items = [
+        {"section": section, "scopeUri": f"file:///project_{i}"}
+        for i in range(10)
+        for section in ("python", "python.analysis")
+    ]
+
+    def transform(revision: Any) -> Callable[[], Any]:
+        def func() -> Any:
+            configurations = [
+                make_configuration() if item["section"] == "python" else make_configuration()["analysis"]
+                for item in items
+            ]
+            transformer.transform(items, configurations, None, revision=revision)
+
+        return func
+
+    yield "transform (20 items)", transform(None)
+    yield "transform (20 items, memoized)", transform(0)
+
+
+@suite("workspace_folder")
+def bench_workspace_folder(tmp_dir: Path) -> Iterable[BenchmarkCase]:
+    utils_lsp = import_plugin_module("utils_lsp")
+
+    folders = [str(tmp_dir / "workspace" / f"project_{i}" / "src") for i in range(500)]
+    window = sublime.Window(folders=folders)
+    file_path = Path(folders[-1], "package", "module.py")
+    if utils_lsp.find_workspace_folder(window, file_path) != Path(folders[-1]).resolve():
+        raise RuntimeError("find_workspace_folder() failed to find the workspace folder.")
+
+    yield "find (500 folders)", lambda: utils_lsp.find_workspace_folder(window, file_path)
+    yield "find outside folders (500 folders)", lambda: utils_lsp.find_workspace_folder(window, tmp_dir / "other.py")
+    yield "build index (500 folders)", lambda: utils_lsp.WorkspaceFolderIndex(folders)
+
+
+# ------ #
+# runner #
+# ------ #
+
+
+def compare_with_baseline(results: list[BenchmarkResult], baseline_path: Path, tolerance: float) -> list[str]:
+    """Returns messages of regressed cases."""
+    baseline = {
+        (result["suite"], result["name"]): result["best"]
+        for result in json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    }
+    regressions: list[str] = []
+    for result in results:
+        if (previous := baseline.get((result.suite, result.name))) and result.best > previous * (1 + tolerance):
+            regressions.append(
+                f"{result.suite} / {result.name}: {previous * 1e6:.1f} us -> {result.best * 1e6:.1f} us"
+                f" ({result.best / previous:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Run only the given suites.")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to the file.")
+    parser.add_argument("--baseline", type=Path, help="A previous JSON output to compare results with.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown ratio against the baseline.")
+    args = parser.parse_args()
+
+    results: list[BenchmarkResult] = []
+    print(f"{'suite':<20} {'case':<40} {'best (us)':>12} {'median (us)':>12}")
+    for suite_name in args.suite or SUITES:
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f"lsp_pyright_bench_{suite_name}_"))
+        try:
+            for case_name, func in SUITES[suite_name](tmp_dir):
+                result = measure(suite_name, case_name, func)
+                results.append(result)
+                print(f"{suite_name:<20} {case_name:<40} {result.best * 1e6:>12.1f} {result.median * 1e6:>12.1f}")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": [result.to_dict() for result in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline and (regressions := compare_with_baseline(results, args.baseline, args.tolerance)):
+        print(f"\nRegressions (tolerance: {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""A headless stand-in of the `LSP.plugin` module."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+import sublime
+import sublime_plugin
+
+ClientNotification = ClientResponse = ServerResponse = ClientRequest = OnPreStartContext = Dict[str, Any]
+
+
+class DottedDict:
+    def __init__(self, d: dict[str, Any] | None = None) -> None:
+        self._d: dict[str, Any] = {}
+        for key, value in (d or {}).items():
+            self.set(key, value)
+
+    def get(self, path: str | None = None, default: Any = None) -> Any:
+        if path is None:
+            return self._d
+        node: Any = self._d
+        for part in path.split("."):
+            if not isinstance(node, dict) or part not in node:
+                return default
+            node = node[part]
+        return node
+
+    def set(self, path: str, value: Any) -> None:
+        *parents, last = path.split(".")
+        node = self._d
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[last] = value
+
+
+class Notification:
+    def __init__(self, method: str, params: Any = None) -> None:
+        self.method = method
+        self.params = params
+
+
+class ClientConfig:
+    def __init__(self, settings: dict[str, Any] | None = None) -> None:
+        self.settings = DottedDict(settings)
+
+
+class Session:
+    def __init__(self, *, window: sublime.Window | None = None, settings: dict[str, Any] | None = None) -> None:
+        self.window = window or sublime.Window()
+        self.config = ClientConfig(settings)
+        self.notifications: list[Notification] = []
+
+    def get_workspace_folders(self) -> list[str]:
+        return self.window.folders()
+
+    def send_notification(self, notification: Notification) -> None:
+        self.notifications.append(notification)
+
+    def set_config_status_async(self, message: str) -> None:
+        pass
+
+
+class LspPlugin:
+    plugin_storage_path: Any = None
+
+    def __init__(self, weaksession: Any) -> None:
+        self.weaksession = weaksession
+
+    @classmethod
+    def register(cls) -> None:
+        pass
+
+    @classmethod
+    def unregister(cls) -> None:
+        pass
+
+
+class LspTextCommand(sublime_plugin.TextCommand):
+    session_name = ""
+
+
+class LspWindowCommand(sublime_plugin.WindowCommand):
+    session_name = ""
+
+
+def parse_uri(uri: str) -> tuple[str, str]:
+    parsed = urlparse(uri)
+    if parsed.scheme == "file":
+        return parsed.scheme, url2pathname(unquote(parsed.path))
+    return parsed.scheme, uri
@@ -0,0 +1,5 @@
+"""A headless stand-in of the `LSP.plugin.core.constants` module."""
+
+from __future__ import annotations
+
+ST_VERSION = 4200
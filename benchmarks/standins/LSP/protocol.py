@@ -0,0 +1,8 @@
+"""A headless stand-in of the `LSP.protocol` module."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+ConfigurationItem = Dict[str, Any]
+LSPAny = Any
@@ -0,0 +1,11 @@
+"""A headless stand-in of the `lsp_utils` module."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class NodeManager:
+    @classmethod
+    def on_pre_start_async(cls, *args: Any, **kwargs: Any) -> None:
+        pass
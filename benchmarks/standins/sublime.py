@@ -0,0 +1,74 @@
+"""A headless stand-in of the `sublime` module, which only provides what the benchmarked code uses."""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+
+def load_resource(name: str) -> str:
+    raise FileNotFoundError(name)
+
+
+def packages_path() -> str:
+    return ""
+
+
+delayed_callbacks: list[Callable[[], Any]] = []
+"""Callbacks with a positive delay, which are never run automatically so that periodic tasks don't recurse."""
+
+
+def set_timeout(callback: Callable[[], Any], delay: int = 0) -> None:
+    if delay > 0:
+        delayed_callbacks.append(callback)
+    else:
+        callback()
+
+
+def set_timeout_async(callback: Callable[[], Any], delay: int = 0) -> None:
+    set_timeout(callback, delay)
+
+
+def status_message(msg: str) -> None:
+    pass
+
+
+def message_dialog(msg: str) -> None:
+    pass
+
+
+def error_message(msg: str) -> None:
+    pass
+
+
+def active_window() -> Window:
+    return Window()
+
+
+class Window:
+    _next_id = 1
+
+    def __init__(self, folders: list[str] | None = None, project_data: dict[str, Any] | None = None) -> None:
+        self._id = Window._next_id
+        Window._next_id += 1
+        self._folders = list(folders or [])
+        self._project_data = project_data
+
+    def id(self) -> int:
+        return self._id
+
+    def folders(self) -> list[str]:
+        return self._folders
+
+    def project_data(self) -> dict[str, Any] | None:
+        return self._project_data
+
+    def active_view(self) -> View | None:
+        return None
+
+
+class View:
+    pass
+
+
+class Edit:
+    pass
@@ -0,0 +1,9 @@
+"""A headless stand-in of the `sublime_lib` module."""
+
+from __future__ import annotations
+
+from pathlib import PurePosixPath
+
+
+class ResourcePath(PurePosixPath):
+    pass
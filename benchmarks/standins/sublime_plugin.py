@@ -0,0 +1,24 @@
+"""A headless stand-in of the `sublime_plugin` module."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class EventListener:
+    pass
+
+
+class ViewEventListener:
+    def __init__(self, view: Any = None) -> None:
+        self.view = view
+
+
+class WindowCommand:
+    def __init__(self, window: Any = None) -> None:
+        self.window = window
+
+
+class TextCommand:
+    def __init__(self, view: Any = None) -> None:
+        self.view = view
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
 from .client import LspPyrightPlugin, ViewEventListener
-from .commands import LspPyrightCreateConfigurationCommand, LspPyrightUpdateViewStatusTextCommand
+from .commands import (
+    LspPyrightCreateConfigurationCommand,
+    LspPyrightRefreshDevEnvironmentCommand,
+    LspPyrightShowFullDocumentationCommand,
+    LspPyrightShowPerformanceReportCommand,
+    LspPyrightUpdateViewStatusTextCommand,
+)
 
 __all__ = (
     # ST: core
@@ -9,6 +15,9 @@ __all__ = (
     "plugin_unloaded",
     # ST: commands
     "LspPyrightCreateConfigurationCommand",
+    "LspPyrightRefreshDevEnvironmentCommand",
+    "LspPyrightShowFullDocumentationCommand",
+    "LspPyrightShowPerformanceReportCommand",
     "LspPyrightUpdateViewStatusTextCommand",
     # ...
     "LspPyrightPlugin",
@@ -20,9 +29,11 @@ def plugin_loaded() -> None:
     """Executed when this plugin is loaded."""
     LspPyrightPlugin.register()
     LspPyrightPlugin.resolve_server_version()
+    LspPyrightPlugin.watch_global_plugin_settings()
 
 
 def plugin_unloaded() -> None:
     """Executed when this plugin is unloaded."""
+    LspPyrightPlugin.unwatch_global_plugin_settings()
     LspPyrightPlugin.wf_attrs.clear()
     LspPyrightPlugin.unregister()
@@ -0,0 +1,130 @@
+"""Generation of `python.analysis.exclude` for directories which are heavy to analyze but never edited."""
+
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from .utils import file_signature
+from .virtual_env.venv_info import list_venv_info_classes
+
+PYRIGHT_DEFAULT_EXCLUDES = ("**/node_modules", "**/__pycache__", "**/.*")
+"""Pyright excludes these by default, but only if `exclude` is not given. So they are always kept."""
+
+PYPROJECT_PYRIGHT_SECTION_RE = re.compile(r"^\s*\[tool\.pyright[\].]", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class AutoExcludeResult:
+    directory_names: tuple[str, ...] = ()
+    """The directory names which the scan has been done with."""
+    patterns: tuple[str, ...] = ()
+    """Glob patterns relative to the workspace folder, excluding `PYRIGHT_DEFAULT_EXCLUDES`."""
+    pruned_dir_count: int = 0
+    """The number of excluded directories."""
+    pruned_file_count: int | None = None
+    """
+    The number of files in excluded directories. Counting stops at `max_counted_files`.
+    `None` if files haven't been counted, which is the case unless the scan runs in the background.
+    """
+
+    def to_exclude(self) -> list[str]:
+        return [*PYRIGHT_DEFAULT_EXCLUDES, *self.patterns]
+
+
+_pyright_config_file_caches: dict[Path, tuple[tuple[tuple[int, int] | None, ...], bool]] = {}
+"""
+Project directory => `(signatures of config files, result)` of `has_pyright_config_file`.
+It's checked for every configuration item so config files are only read again once they are modified.
+"""
+
+
+def has_pyright_config_file(project_dir: Path) -> bool:
+    """Whether the project is configured by `pyrightconfig.json` or `[tool.pyright]` in `pyproject.toml`."""
+    pyrightconfig_path = project_dir / "pyrightconfig.json"
+    pyproject_path = project_dir / "pyproject.toml"
+    signatures = (file_signature(pyrightconfig_path), file_signature(pyproject_path))
+    if (cached := _pyright_config_file_caches.get(project_dir)) and cached[0] == signatures:
+        return cached[1]
+
+    if pyrightconfig_path.is_file():
+        result = True
+    else:
+        try:
+            content = pyproject_path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            content = ""
+        result = bool(PYPROJECT_PYRIGHT_SECTION_RE.search(content))
+    _pyright_config_file_caches[project_dir] = (signatures, result)
+    return result
+
+
+def scan_auto_excludes(
+    project_dir: Path,
+    *,
+    directory_names: Sequence[str],
+    max_depth: int = 4,
+    max_counted_files: int | None = None,
+) -> AutoExcludeResult:
+    """
+    Scans the project for directories to be excluded from the analysis in a single walk.
+
+    Directories whose names are in `directory_names` become `**/<name>` patterns, and virtual environments
+    become patterns of their relative paths. Hidden directories are pruned as pyright excludes them by default.
+    Directories deeper than `max_depth` are not visited. Files in excluded directories are only counted
+    if `max_counted_files` is given, where a non-positive value means no limit.
+    """
+    marker_names = frozenset(venv_info_cls.marker_name for venv_info_cls in list_venv_info_classes())
+    found_names: set[str] = set()
+    venv_dirs: list[str] = []
+    pruned_dirs: list[str] = []
+
+    stack = [(str(project_dir), 0)]
+    while stack:
+        dir_path, depth = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith(".") and entry.name not in directory_names:
+                continue  # excluded by "**/.*" already
+            if entry.name in directory_names:
+                found_names.add(entry.name)
+                pruned_dirs.append(entry.path)
+            elif any(os.path.exists(os.path.join(entry.path, name)) for name in marker_names):
+                venv_dirs.append(Path(entry.path).relative_to(project_dir).as_posix())
+                pruned_dirs.append(entry.path)
+            elif depth + 1 < max_depth:
+                stack.append((entry.path, depth + 1))
+
+    patterns = tuple(f"**/{name}" for name in sorted(found_names) if f"**/{name}" not in PYRIGHT_DEFAULT_EXCLUDES)
+    return AutoExcludeResult(
+        directory_names=tuple(directory_names),
+        patterns=patterns + tuple(sorted(venv_dirs)),
+        pruned_dir_count=len(pruned_dirs),
+        pruned_file_count=None if max_counted_files is None else count_files(pruned_dirs, max_count=max_counted_files),
+    )
+
+
+def count_files(dir_paths: Collection[str], *, max_count: int = 0) -> int:
+    """Counts files in directories recursively. If `max_count` is positive, counting stops at it."""
+    count = 0
+    stack = list(dir_paths)
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        count += 1
+                        if 0 < max_count <= count:
+                            return count
+        except OSError:
+            continue
+    return count
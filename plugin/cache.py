@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from .log import log_warning
+
+
+class JsonFileCache:
+    """
+    A small key-value cache which is persisted as a JSON file.
+
+    The file is lazily loaded on the first access and rewritten atomically on every modification.
+    If the stored `version` differs from the expected one, the stored content is discarded.
+    """
+
+    def __init__(self, path: Path, *, version: int = 1) -> None:
+        self.path = path
+        """The path of the JSON file."""
+        self.version = version
+        """The version of the cache format."""
+        self._entries: dict[str, Any] | None = None
+        self._lock = threading.RLock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._load().get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._load()[key] = value
+            self._save()
+
+    def pop(self, key: str) -> Any:
+        with self._lock:
+            if (value := self._load().pop(key, None)) is not None:
+                self._save()
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def _load(self) -> dict[str, Any]:
+        if self._entries is None:
+            try:
+                content = json.loads(self.path.read_bytes())
+            except (OSError, ValueError):
+                content = None
+            if (
+                isinstance(content, dict)
+                and content.get("version") == self.version
+                and isinstance(entries := content.get("entries"), dict)
+            ):
+                self._entries = entries
+            else:
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps({"version": self.version, "entries": self._entries}), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log_warning(f'Failed to write cache file "{self.path}": {e}')
+
+
+@lru_cache
+def get_json_file_cache(path: Path, *, version: int = 1) -> JsonFileCache:
+    """Gets the shared `JsonFileCache` instance for the file."""
+    return JsonFileCache(path, version=version)
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 import json
-import re
+import threading
+import time
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import final
+from typing import Callable, Hashable, Sequence, TypeVar, final
+from weakref import WeakKeyDictionary, ref
 
-import jmespath
 import sublime
 import sublime_plugin
 from LSP.plugin import (
     ClientNotification,
+    ClientRequest,
     ClientResponse,
+    DottedDict,
     LspPlugin,
     OnPreStartContext,
     ServerResponse,
@@ -22,17 +27,74 @@ from lsp_utils import NodeManager
 from sublime_lib import ResourcePath
 from typing_extensions import override
 
-from .constants import PACKAGE_NAME, SERVER_SETTING_ANALYSIS_EXTRAPATHS, SERVER_SETTING_DEV_ENVIRONMENT
+from .auto_exclude import AutoExcludeResult, has_pyright_config_file, scan_auto_excludes
+from .cache import JsonFileCache, get_json_file_cache
+from .configuration_transformer import ConfigurationTransformer
+from .constants import (
+    PACKAGE_NAME,
+    SERVER_SETTING_ANALYSIS_EXCLUDE,
+    SERVER_SETTING_ANALYSIS_EXTRAPATHS,
+    SERVER_SETTING_ANALYSIS_STUBPATH,
+    SERVER_SETTING_DEV_ENVIRONMENT,
+)
 from .dev_environment.helpers import get_dev_environment_handler
-from .log import log_error, log_warning
+from .extra_paths import ExtraPathsComposer, ExtraPathsLayer
+from .log import log_debug, log_error, log_info, log_warning
+from .markdown import MARKDOWN_CACHE, patch_documentation
+from .memory_governor import compute_max_old_space_size, count_python_files, get_system_memory
+from .perf import PERF_RECORDER, RequestTracker
+from .process_runner import ProcessOptions
+from .resource_sync import link_path, sync_resource_tree
+from .server_process import (
+    ProcessStats,
+    SERVER_TAG_ARG_PREFIX,
+    SERVER_TAG_SETTING,
+    ServerProcessMonitor,
+    ServerStats,
+    make_server_tag,
+    template_uses_server_stats,
+)
+from .utils import drop_falsy, unique_everseen
 from .utils_lsp import (
     ConfigurationProxy,
-    ConfigurationSection,
     WorkspaceFolderAttr,
     find_workspace_folder,
+    parse_configuration_section,
+    send_did_change_configuration,
     uri_to_file_path,
 )
 from .virtual_env.helpers import find_venv_by_finder_names
+from .virtual_env.venv_cache import VenvCache
+from .virtual_env.venv_info import BaseVenvInfo
+from .virtual_env.venv_watcher import VenvMarkerWatcher
+
+PYTHON_ANALYSIS_SECTION = parse_configuration_section("python.analysis")
+NON_SOURCE_DIRECTORY_NAMES = frozenset(("node_modules", "__pycache__", "site-packages", "build", "dist"))
+"""Directories which are not counted as a part of the workspace for sizing the server heap."""
+SERVER_MIN_UPTIME_BEFORE_RESTART = 300
+"""Seconds. A server which exceeds the memory threshold right after starting is not restarted to avoid a loop."""
+AUTO_EXCLUDE_MAX_COUNTED_FILES = 100_000
+"""Counting files in excluded directories for the log stops at this number."""
+
+_T = TypeVar("_T")
+
+
+def take_future_result(future: Future[_T], fallback: Callable[[], _T]) -> _T:
+    """Waits for the result of the future. If it has failed, the result of `fallback` is used instead."""
+    try:
+        return future.result()
+    except Exception as ex:
+        log_warning(f"Background resolution failed, resolving again: {ex}")
+        return fallback()
+
+
+@dataclass
+class ConfigurationRequestContext:
+    """The state shared by configuration rules during a `workspace/configuration` response."""
+
+    session: Session
+    venv_infos: dict[tuple[Path | None, tuple[str, ...]], BaseVenvInfo | None] = field(default_factory=dict)
+    """Found venvs per `(workspace folder, venv strategies)`, which are resolved only once per response."""
 
 
 class ViewEventListener(sublime_plugin.ViewEventListener):
@@ -47,11 +109,58 @@ class LspPyrightPlugin(LspPlugin):
     """The version of the language server."""
     wf_attrs: defaultdict[Path, WorkspaceFolderAttr] = defaultdict(WorkspaceFolderAttr)
     """Per workspace folder attributes."""
+    _venv_cache: VenvCache | None = None
+    _python_33_types_deployment: threading.Thread | None = None
+    server_stats: WeakKeyDictionary[Session, ServerStats] = WeakKeyDictionary()
+    """The latest sampled server stats per session."""
+
+    def __init__(self, weaksession: ref[Session]) -> None:
+        super().__init__(weaksession)
+        self.venv_watcher = VenvMarkerWatcher()
+        """Watches files which venv finders depend on for workspace folders of this session."""
+        self._is_polling_venv_markers = False
+        self.extra_paths = ExtraPathsComposer()
+        """Composes `extraPaths` from layers without modifying the session settings."""
+        self._configuration_revision = 0
+        self.documentation_size_limit = 0
+        """Documentation longer than this is truncated. Non-positive means no limit."""
+        self.configuration_transformer = ConfigurationTransformer[ConfigurationRequestContext]()
+        """Rewrites configurations of `workspace/configuration` responses."""
+        self.configuration_transformer.register("python", self.provide_venv_python_path)
+        self.configuration_transformer.register(SERVER_SETTING_ANALYSIS_EXTRAPATHS, self.provide_extra_paths)
+        self.configuration_transformer.register(SERVER_SETTING_ANALYSIS_STUBPATH, self.remove_default_stub_path)
+        self.configuration_transformer.register(SERVER_SETTING_ANALYSIS_EXCLUDE, self.provide_auto_exclude)
+        self._prewarmed_venv_infos: dict[tuple[Path, tuple[str, ...]], Future[BaseVenvInfo | None]] = {}
+        """Venvs being resolved in the background, which are taken by the first configuration request."""
+        self._prewarmed_dev_environment_layer: Future[ExtraPathsLayer | None] | None = None
+        """The dev environment being resolved in the background, which is taken by the first configuration change."""
+        self._prewarmed_auto_excludes: dict[tuple[Path, tuple[str, ...]], Future[AutoExcludeResult]] = {}
+        """Workspace folders being scanned for `autoExclude` in the background."""
+        sublime.set_timeout_async(self.prewarm_async)
+        self._created_at = time.monotonic()
+        self.server_process: ServerProcessMonitor | None = None
+        """Samples the resource usage of the server if it's been started with a tag."""
+        self.request_tracker = RequestTracker()
+        """Tracks in-flight requests and their latencies for `ServerStats`."""
+        self._is_sampling_server = False
+        if session := weaksession():
+            if tag := session.config.settings.get(SERVER_TAG_SETTING):
+                self.server_process = ServerProcessMonitor(tag)
+            self.ensure_server_sampling(session)
+            self.count_python_files_in_background(session)
+
+    @classmethod
+    def venv_cache(cls) -> VenvCache:
+        """The persistent cache of found virtual environments."""
+        if cls._venv_cache is None:
+            cls._venv_cache = VenvCache(cls.plugin_storage_path / "caches" / "venv.json")
+        return cls._venv_cache
 
     @classmethod
     def resolve_server_version(cls) -> None:
         lock_file_content = sublime.load_resource(f"Packages/{PACKAGE_NAME}/language-server/package-lock.json")
-        cls.server_version = jmespath.search("dependencies.pyright.version", json.loads(lock_file_content)) or ""
+        dependencies = json.loads(lock_file_content).get("dependencies") or {}
+        cls.server_version = (dependencies.get("pyright") or {}).get("version") or ""
 
     @classmethod
     @override
@@ -66,62 +175,156 @@ class LspPyrightPlugin(LspPlugin):
             on_server_installed=cls.on_server_installed,
         )
         cls.handle_python_33_types()
+        cls.apply_server_command_options(context)
+
+    @classmethod
+    def apply_server_command_options(cls, context: OnPreStartContext) -> None:
+        """Adds `--max-old-space-size` and the tag for finding the server process to the server command."""
+        configuration = context.configuration
+        # only the default command can be extended safely
+        if not (command := list(configuration.command)) or command[0] != "${node_bin}":
+            return
+        # a restart may reuse the configuration which has been extended by the previous start
+        command = [arg for arg in command if not arg.startswith(("--max-old-space-size=", SERVER_TAG_ARG_PREFIX))]
+        configuration.settings.set(SERVER_TAG_SETTING, None)
+        if (max_old_space_size := cls.resolve_max_old_space_size(context)) > 0:
+            command.insert(1, f"--max-old-space-size={max_old_space_size}")
+        # changing settings restarts the server so the process only has to be tagged if sampling is enabled now
+        if cls.get_server_sampling_interval(configuration.settings) > 0:
+            tag = make_server_tag()
+            command.append(f"{SERVER_TAG_ARG_PREFIX}{tag}")
+            configuration.settings.set(SERVER_TAG_SETTING, tag)
+        configuration.command = command
+
+    @classmethod
+    def resolve_max_old_space_size(cls, context: OnPreStartContext) -> int:
+        """Returns the V8 heap limit in MB for the server. Non-positive means Node's default."""
+        setting = context.configuration.settings.get("serverMaxOldSpaceSize")
+        if isinstance(setting, int):
+            return setting
+        if setting != "auto":
+            return 0
+        # counting files would delay the server start so counts from the previous start are used
+        counts = [cls.python_file_count_cache().get(folder.path) for folder in context.workspace_folders]
+        if not all(isinstance(count, int) for count in counts):
+            log_debug("Python files haven't been counted yet. Using the default heap size of Node.")
+            return 0
+        python_file_count = sum(counts)
+        max_old_space_size = compute_max_old_space_size(python_file_count, get_system_memory())
+        log_debug(f"Picked --max-old-space-size={max_old_space_size} for {python_file_count} Python files.")
+        return max_old_space_size
+
+    @classmethod
+    def python_file_count_cache(cls) -> JsonFileCache:
+        """Workspace folder => the number of Python files in it, which is used for `"serverMaxOldSpaceSize": "auto"`."""
+        return get_json_file_cache(cls.plugin_storage_path / "caches" / "python_file_counts.json")
+
+    def count_python_files_in_background(self, session: Session) -> None:
+        """Counts Python files of workspace folders for the next start of the server."""
+        if session.config.settings.get("serverMaxOldSpaceSize") != "auto":
+            return
+
+        def count() -> None:
+            cache = self.python_file_count_cache()
+            for folder in folders:
+                cache.set(folder, count_python_files((folder,), ignores=NON_SOURCE_DIRECTORY_NAMES, max_count=100_000))
+
+        folders = tuple(session.window.folders())
+        threading.Thread(target=count, name="lsp-pyright-count-python-files", daemon=True).start()
 
     @classmethod
     def on_server_installed(cls, server_directory: Path) -> None:
         package_name = cls.plugin_storage_path.name
         overwrites_path = ResourcePath("Packages", package_name, "overwrites")
+        manifest_path = server_directory.with_name(f"{server_directory.name}.overwrites.json")
         try:
-            overwrites_path.copytree(server_directory, exist_ok=True)
+            report = sync_resource_tree(
+                overwrites_path, server_directory, manifest_path=manifest_path, version=cls.server_version
+            )
         except OSError:
             raise RuntimeError(f'Failed to copy overwrite dirs from "{overwrites_path}" to "{server_directory}".')
+        log_info(f'Copied overwrite dirs into "{server_directory}": {report}')
 
     @classmethod
     def handle_python_33_types(cls) -> None:
+        """Deploys Python 3.3 stubs in the background since only the "sublime_text_33" dev environment uses them."""
+        if cls._python_33_types_deployment and cls._python_33_types_deployment.is_alive():
+            return
+        cls._python_33_types_deployment = threading.Thread(target=cls.deploy_python_33_types, daemon=True)
+        cls._python_33_types_deployment.start()
+
+    @classmethod
+    def wait_for_python_33_types(cls, timeout: float = 10) -> bool:
+        """Returns whether the deployment has finished (or never started) within the timeout."""
+        if deployment := cls._python_33_types_deployment:
+            deployment.join(timeout)
+            return not deployment.is_alive()
+        return True
+
+    @classmethod
+    def deploy_python_33_types(cls) -> None:
         package_name = cls.plugin_storage_path.name
         dir_src = ResourcePath(f"Packages/{package_name}/resources")
         dir_dst = cls.plugin_storage_path
-        version_file = dir_dst / "VERSION"
-        if version_file.is_file() and version_file.read_text(encoding="utf-8") == cls.server_version:
-            return
         try:
-            ResourcePath(dir_src).copytree(dir_dst, exist_ok=True)
-            version_file.write_text(cls.server_version, encoding="utf-8")
-        except OSError:
-            raise RuntimeError(f'Failed to copy overwrite dirs from "{dir_src}" to "{dir_dst}".')
+            # if the package is unpacked, link to the package directory rather than copying files from it
+            if (package_dir := dir_src.file_path()).is_dir() and all(
+                link_path(src, dir_dst / src.name) for src in package_dir.iterdir()
+            ):
+                return
+            # previously linked (unpacked) package directories must not be written into
+            for child in dir_src.children():
+                if (dst := dir_dst / child.name).is_symlink():
+                    dst.unlink()
+            report = sync_resource_tree(dir_src, dir_dst, manifest_path=dir_dst / "resources.manifest.json")
+            log_debug(f'Copied Python 3.3 stubs into "{dir_dst}": {report}')
+        except OSError as e:
+            log_error(f'Failed to deploy Python 3.3 stubs from "{dir_src}" to "{dir_dst}": {e}')
+
+    @override
+    def on_pre_send_request_async(self, request: ClientRequest) -> None:
+        self.request_tracker.start(request["method"], request.get("id"))
 
     @override
     def on_server_response_async(self, response: ServerResponse) -> None:
+        self.request_tracker.finish(response["method"], response.get("id"))
+        with PERF_RECORDER.measure("on_server_response_async", response["method"]):
+            self.patch_response_markdown(response)
+
+    def patch_response_markdown(self, response: ServerResponse) -> None:
+        size_limit = self.documentation_size_limit
         if response["method"] == "textDocument/hover":
             if hover := response["result"]:
                 contents = hover["contents"]
                 if isinstance(contents, dict) and contents.get("kind") == "markdown":
-                    contents["value"] = self.patch_markdown_content(contents["value"])
+                    contents["value"] = patch_documentation(contents["value"], size_limit=size_limit)
             return
         if response["method"] == "completionItem/resolve":
             completion = response["result"]
             documentation = completion.get("documentation")
             if isinstance(documentation, dict) and documentation.get("kind") == "markdown":
-                documentation["value"] = self.patch_markdown_content(documentation["value"])
+                documentation["value"] = patch_documentation(documentation["value"], size_limit=size_limit)
             return
         if response["method"] == "textDocument/signatureHelp":
             if signature_help := response["result"]:
                 for signature in signature_help["signatures"]:
                     documentation = signature.get("documentation")
                     if isinstance(documentation, dict) and documentation.get("kind") == "markdown":
-                        documentation["value"] = self.patch_markdown_content(documentation["value"])
+                        documentation["value"] = patch_documentation(documentation["value"], size_limit=size_limit)
                     for parameter in signature.get("parameters") or []:
                         documentation = parameter.get("documentation")
                         if isinstance(documentation, dict) and documentation.get("kind") == "markdown":
-                            documentation["value"] = self.patch_markdown_content(documentation["value"])
+                            documentation["value"] = patch_documentation(documentation["value"], size_limit=size_limit)
             return
 
     @override
     def on_pre_send_notification_async(self, notification: ClientNotification) -> None:
         if notification["method"] == "workspace/didChangeConfiguration" and (session := self.weaksession()):
-            extra_paths: list[str] = session.config.settings.get(SERVER_SETTING_ANALYSIS_EXTRAPATHS, [])
-            extra_paths.extend(self.resolve_extra_paths_for_dev_environment(session))
-            session.config.settings.set(SERVER_SETTING_ANALYSIS_EXTRAPATHS, extra_paths)
+            self._configuration_revision += 1
+            self.apply_plugin_settings(session)
+            self.ensure_server_sampling(session)
+            if self.extra_paths.set_dev_environment_layer(self.take_prewarmed_dev_environment_layer(session)):
+                self.log_extra_paths()
             # Skip updating the notification params as pyright doesn't care about those - it gets settings through
             # the `workspace/configuration` request.
             return
@@ -131,36 +334,295 @@ class LspPyrightPlugin(LspPlugin):
         if response["method"] == "workspace/configuration":
             items = response["params"]["items"]
             configurations = response["result"]
-            self.handle_workspace_configuration(items, configurations)
-            self.handle_stub_path_configuration(items, configurations)
+            with PERF_RECORDER.measure("on_pre_send_response_async", response["method"]):
+                self.handle_workspace_configuration(items, configurations)
             return
 
     def handle_workspace_configuration(self, items: list[ConfigurationItem], configurations: list[LSPAny]) -> None:
         if not (session := self.weaksession()):
             return
-        for i, item in enumerate(items):
-            if (configuration := configurations[i]) and isinstance(configuration, dict):
-                configuration_proxy = ConfigurationProxy(configuration, ConfigurationSection(item.get("section")))
-                self.handle_venv_strategies(session, item, configuration_proxy)
+        self.apply_plugin_settings(session)
+        context = ConfigurationRequestContext(session)
+        is_memo_used = self.configuration_transformer.transform(
+            items,
+            configurations,
+            context,
+            revision=self.get_configuration_revision(session),
+        )
+        # When ST just starts, server session hasn't been created yet.
+        # So `on_activated` can't add full information for the initial view and hence we handle it here.
+        # A reused configuration leaves no venv in the context but the venv may have been detected for it.
+        if (is_memo_used or any(context.venv_infos.values())) and (
+            active_view := sublime.active_window().active_view()
+        ):
+            active_view.run_command("lsp_pyright_update_view_status_text")
 
-    def handle_stub_path_configuration(self, items: list[ConfigurationItem], configurations: list[LSPAny]) -> None:
-        # If stubPath is not set, remove it rather than sending default value.
-        # This lets the server know that it's unset rather than explicitly set to the default value (typings)
-        # so it can behave differently.
-        for i, item in enumerate(items):
-            result = configurations[i]
-            if (
-                isinstance(result, dict)
-                and (
-                    (item.get("section") == "python" and (analysisConfig := result["analysis"]))
-                    or (item.get("section") == "python.analysis" and (analysisConfig := result))
-                )
-                and analysisConfig["stubPath"] == "typings"
-            ):
-                del analysisConfig["stubPath"]
+    def get_configuration_revision(self, session: Session) -> Hashable:
+        """
+        Transformed configurations are reused until this changes. `None` means they are never reused.
+
+        Besides the count of configuration changes, it covers what rules depend on per workspace folder:
+        the detected venv and the `autoExclude` scan. The venv can only be noticed to be changed by the venv watcher
+        so transformed configurations can't be reused if the watcher is disabled. Neither are they while anything
+        is still being resolved in the background.
+        """
+        if (session.config.settings.get("venvWatchInterval") or 0) <= 0:
+            return None
+        if any(not future.done() for future in self._prewarmed_venv_infos.values()) or any(
+            not future.done() for future in self._prewarmed_auto_excludes.values()
+        ):
+            return None
+        folders = tuple(session.window.folders())
+        wf_states: list[tuple[Path, Path | None, AutoExcludeResult | None]] = []
+        for wf_path in unique_everseen(drop_falsy(find_workspace_folder(session.window, folder) for folder in folders)):
+            wf_attr = self.wf_attrs[wf_path]
+            venv_dir = wf_attr.venv_info.venv_dir if wf_attr.venv_info else None
+            wf_states.append((wf_path, venv_dir, wf_attr.auto_exclude))
+        return (self._configuration_revision, folders, tuple(wf_states))
+
+    def apply_plugin_settings(self, session: Session) -> None:
+        """Applies settings which are used by this plugin rather than the server."""
+        settings = session.config.settings
+        self.documentation_size_limit = settings.get("documentationSizeLimit") or 0
+
+    @classmethod
+    def watch_global_plugin_settings(cls) -> None:
+        """
+        Applies settings of objects shared by all windows whenever the package settings change.
+
+        They are read from the package settings only, not from project settings of any session,
+        so that whichever session is configured last doesn't decide for all windows.
+        """
+        sublime.load_settings(f"{PACKAGE_NAME}.sublime-settings").add_on_change(
+            PACKAGE_NAME, cls.apply_global_plugin_settings
+        )
+        cls.apply_global_plugin_settings()
+
+    @classmethod
+    def unwatch_global_plugin_settings(cls) -> None:
+        sublime.load_settings(f"{PACKAGE_NAME}.sublime-settings").clear_on_change(PACKAGE_NAME)
+
+    @classmethod
+    def apply_global_plugin_settings(cls) -> None:
+        settings = sublime.load_settings(f"{PACKAGE_NAME}.sublime-settings").get("settings") or {}
+        MARKDOWN_CACHE.resize(settings.get("markdownCacheSize") or 0)
+        PERF_RECORDER.enabled = bool(settings.get("performanceInstrumentation"))
+
+    def resolve_venv_info(
+        self,
+        session: Session,
+        wf_path: Path | None,
+        venv_strategies: tuple[str, ...],
+        venv_infos: dict[tuple[Path | None, tuple[str, ...]], BaseVenvInfo | None],
+    ) -> BaseVenvInfo | None:
+        """Finds the venv for the workspace folder. Results are memoized in `venv_infos`."""
+        if (key := (wf_path, venv_strategies)) in venv_infos:
+            return venv_infos[key]
+        if wf_path:
+            self.watch_venv_markers(session, wf_path, venv_strategies)
+        if wf_path and (future := self._prewarmed_venv_infos.pop((wf_path, venv_strategies), None)):
+            venv_info = take_future_result(future, lambda: self.find_venv(session, wf_path, venv_strategies))
+        else:
+            venv_info = self.find_venv(session, wf_path, venv_strategies)
+        venv_infos[key] = venv_info
+        if wf_path and venv_info:
+            self.wf_attrs[wf_path].venv_info = venv_info
+        return venv_info
+
+    def ensure_server_sampling(self, session: Session) -> None:
+        if not self._is_sampling_server:
+            self._is_sampling_server = True
+            self.schedule_server_sampling(session)
 
-    def resolve_extra_paths_for_dev_environment(self, session: Session) -> list[str]:
+    def schedule_server_sampling(self, session: Session) -> None:
+        if (interval := self.get_server_sampling_interval(session.config.settings)) > 0:
+            sublime.set_timeout_async(self.sample_server_async, int(interval * 1000))
+        else:
+            self._is_sampling_server = False
+
+    @staticmethod
+    def get_server_sampling_interval(settings: DottedDict) -> float:
+        """The interval in seconds which is the shortest one among features needing sampling. `0` if none needs it."""
+        intervals: list[float] = []
+        if (settings.get("serverMemoryRestartThreshold") or 0) > 0:
+            intervals.append(settings.get("serverMemorySampleInterval") or 0)
+        if template_uses_server_stats(settings.get("statusText") or ""):
+            intervals.append(settings.get("serverStatsInterval") or 0)
+        return min((interval for interval in intervals if interval > 0), default=0)
+
+    def sample_server_async(self) -> None:
+        """Samples the server in a worker thread since invoking `ps` would block the async thread."""
+        if not (session := self.weaksession()):
+            return  # the session has ended so stop sampling
+        process_options = ProcessOptions.from_settings(session.config.settings)
+        server_process = self.server_process
+
+        def sample() -> None:
+            process_stats = server_process.sample(process_options) if server_process else None
+            sublime.set_timeout_async(lambda: self.on_server_sampled_async(process_stats))
+
+        threading.Thread(target=sample, name="lsp-pyright-sample-server", daemon=True).start()
+
+    def on_server_sampled_async(self, process_stats: ProcessStats | None) -> None:
+        if not (session := self.weaksession()):
+            return  # the session has ended so stop sampling
+        self.update_server_stats(session, process_stats)
+        threshold_mb = session.config.settings.get("serverMemoryRestartThreshold") or 0
+        if threshold_mb > 0 and process_stats and process_stats.rss > threshold_mb * 1024 * 1024:
+            if time.monotonic() - self._created_at >= SERVER_MIN_UPTIME_BEFORE_RESTART:
+                if self.restart_server(session):
+                    log_warning(
+                        f"Restarted the server (PID: {process_stats.pid}) since its memory usage"
+                        f" ({process_stats.rss // (1024 * 1024)} MB) exceeds {threshold_mb} MB."
+                    )
+                    self._is_sampling_server = False
+                    return
+                log_debug(f"The server exceeds {threshold_mb} MB but there is no view to restart it from. Retrying.")
+            else:
+                log_debug(f"The server exceeds {threshold_mb} MB but it has just started. Skipped restarting.")
+        self.schedule_server_sampling(session)
+
+    def update_server_stats(self, session: Session, process_stats: ProcessStats | None) -> None:
+        """Updates `server_stats` and refreshes the status text if it shows them."""
+        tracker = self.request_tracker
+        hover_p95 = tracker.latency_percentile("textDocument/hover", 95)
+        completion_p95 = tracker.latency_percentile("textDocument/completion", 95)
+        cpu_percent = self.server_process.cpu_percent if self.server_process else None
+        server_stats = ServerStats(
+            rss_mb=process_stats.rss // (1024 * 1024) if process_stats else None,
+            cpu_percent=round(cpu_percent, 1) if cpu_percent is not None else None,
+            pending_requests=tracker.pending_count(),
+            hover_p95_ms=round(hover_p95 * 1000) if hover_p95 is not None else None,
+            completion_p95_ms=round(completion_p95 * 1000) if completion_p95 is not None else None,
+        )
+        if self.server_stats.get(session) == server_stats:
+            return
+        self.server_stats[session] = server_stats
+        if template_uses_server_stats(session.config.settings.get("statusText") or "") and (
+            view := session.window.active_view()
+        ):
+            view.run_command("lsp_pyright_update_view_status_text")
+
+    def restart_server(self, session: Session) -> bool:
+        """
+        Restarts the session. Opened files are reopened by LSP, detected venvs are restored from the venv cache
+        and workspace folder attributes are kept, so nothing has to be resolved again.
+
+        Returns whether the restart has been triggered, which needs a view since the LSP command is a text command.
+        """
+        if not (view := session.window.active_view()):
+            return False
+        view.run_command("lsp_restart_server", {"config_name": PACKAGE_NAME})
+        return True
+
+    def find_venv(self, session: Session, wf_path: Path | None, venv_strategies: Sequence[str]) -> BaseVenvInfo | None:
+        return find_venv_by_finder_names(
+            venv_strategies,
+            project_dir=wf_path,
+            session=session,
+            cache=self.venv_cache(),
+            concurrent=bool(session.config.settings.get("venvStrategiesConcurrent")),
+        )
+
+    def prewarm_async(self) -> None:
+        """
+        Starts resolving venvs of workspace folders and the dev environment in the background
+        so that they are likely ready when the server asks for configurations after it's initialized.
+        """
+        # configurations have already been resolved if the server is faster than this
+        if not (session := self.weaksession()) or self._configuration_revision:
+            return
+        venv_strategies = tuple(session.config.settings.get("venvStrategies") or ())
+        wf_paths = tuple(
+            unique_everseen(
+                drop_falsy(find_workspace_folder(session.window, folder) for folder in session.window.folders())
+            )
+        )
+        executor = ThreadPoolExecutor(max_workers=min(len(wf_paths) + 1, 8), thread_name_prefix="lsp-pyright-prewarm")
+        try:
+            self._prewarmed_dev_environment_layer = executor.submit(
+                self.resolve_extra_paths_for_dev_environment, session
+            )
+            if venv_strategies:
+                for wf_path in wf_paths:
+                    self._prewarmed_venv_infos[(wf_path, venv_strategies)] = executor.submit(
+                        self.find_venv, session, wf_path, venv_strategies
+                    )
+            if session.config.settings.get("autoExclude"):
+                directory_names = tuple(session.config.settings.get("autoExcludeDirectories") or ())
+                for wf_path in wf_paths:
+                    if not self.wf_attrs[wf_path].auto_exclude:
+                        self._prewarmed_auto_excludes[(wf_path, directory_names)] = executor.submit(
+                            scan_auto_excludes,
+                            wf_path,
+                            directory_names=directory_names,
+                            max_counted_files=AUTO_EXCLUDE_MAX_COUNTED_FILES,
+                        )
+        finally:
+            executor.shutdown(wait=False)
+
+    def take_prewarmed_dev_environment_layer(self, session: Session) -> ExtraPathsLayer | None:
+        if future := self._prewarmed_dev_environment_layer:
+            self._prewarmed_dev_environment_layer = None
+            return take_future_result(future, lambda: self.resolve_extra_paths_for_dev_environment(session))
+        return self.resolve_extra_paths_for_dev_environment(session)
+
+    def watch_venv_markers(self, session: Session, wf_path: Path, venv_strategies: Sequence[str]) -> None:
+        self.venv_watcher.watch(wf_path, venv_strategies, session=session)
+        if not self._is_polling_venv_markers:
+            self._is_polling_venv_markers = True
+            self.schedule_venv_markers_polling(session)
+
+    def schedule_venv_markers_polling(self, session: Session) -> None:
+        if (interval := session.config.settings.get("venvWatchInterval") or 0) > 0:
+            sublime.set_timeout_async(self.poll_venv_markers_async, int(interval * 1000))
+        else:
+            self._is_polling_venv_markers = False
+
+    def poll_venv_markers_async(self) -> None:
+        """Polls venv markers and detects venvs again in a worker thread, which may touch the disk heavily."""
+        if not (session := self.weaksession()):
+            return  # the session has ended so stop polling
+        venv_strategies = tuple(session.config.settings.get("venvStrategies") or ())
+
+        def poll() -> None:
+            # only finders whose own signatures have changed are run again, the others hit the venv cache
+            venv_infos = {
+                wf_path: self.find_venv(session, wf_path, venv_strategies)
+                for wf_path in self.venv_watcher.poll(session=session)
+            }
+            sublime.set_timeout_async(lambda: self.on_venv_markers_polled_async(venv_infos))
+
+        threading.Thread(target=poll, name="lsp-pyright-poll-venv-markers", daemon=True).start()
+
+    def on_venv_markers_polled_async(self, venv_infos: dict[Path, BaseVenvInfo | None]) -> None:
+        if not (session := self.weaksession()):
+            return  # the session has ended so stop polling
+        if self.update_venv_infos(venv_infos):
+            # the server requests configurations of all workspace folders but unchanged ones hit the venv cache
+            self._configuration_revision += 1
+            send_did_change_configuration(session)
+        self.schedule_venv_markers_polling(session)
+
+    def update_venv_infos(self, venv_infos: dict[Path, BaseVenvInfo | None]) -> bool:
+        """Applies venvs detected again for workspace folders. Returns whether any of them has changed."""
+        changed_wf_paths: list[Path] = []
+        for wf_path, venv_info in venv_infos.items():
+            if (wf_attr := self.wf_attrs[wf_path]).venv_info != venv_info:
+                wf_attr.venv_info = venv_info
+                changed_wf_paths.append(wf_path)
+        if changed_wf_paths:
+            log_info(f"Detected venv has changed for: {', '.join(map(str, changed_wf_paths))}")
+        return bool(changed_wf_paths)
+
+    def resolve_extra_paths_for_dev_environment(self, session: Session) -> ExtraPathsLayer | None:
         dev_environment = session.config.settings.get(SERVER_SETTING_DEV_ENVIRONMENT)
+        if not isinstance(dev_environment, str):
+            if dev_environment is not None:
+                log_warning(f'"{SERVER_SETTING_DEV_ENVIRONMENT}" must be a string but got: {dev_environment!r}')
+            return None
+        if dev_environment.startswith("sublime_text") and not self.wait_for_python_33_types():
+            log_warning("Python 3.3 stubs are still being deployed. They may be missing until configurations change.")
         try:
             if handler := get_dev_environment_handler(
                 dev_environment,
@@ -175,53 +637,108 @@ class LspPyrightPlugin(LspPlugin):
                 return handler.resolve_extra_paths(settings=session.config.settings)
         except Exception as ex:
             log_error(f'Failed to update extra paths for dev environment "{dev_environment}": {ex}')
-        return []
+        return None
+
+    def resolve_item_venv_info(
+        self,
+        item: ConfigurationItem,
+        context: ConfigurationRequestContext,
+    ) -> BaseVenvInfo | None:
+        session = context.session
+        if not (venv_strategies := tuple(session.config.settings.get("venvStrategies") or ())):
+            return None
+        wf_path = self.resolve_item_workspace_folder(item, context)
+        return self.resolve_venv_info(session, wf_path, venv_strategies, context.venv_infos)
 
-    def handle_venv_strategies(
-        self, session: Session, item: ConfigurationItem, configuration_proxy: ConfigurationProxy
+    def resolve_item_workspace_folder(
+        self,
+        item: ConfigurationItem,
+        context: ConfigurationRequestContext,
+    ) -> Path | None:
+        file_path = uri_to_file_path(item.get("scopeUri", ""))
+        return find_workspace_folder(context.session.window, file_path) if file_path else None
+
+    def resolve_auto_exclude(self, wf_path: Path, directory_names: tuple[str, ...]) -> AutoExcludeResult:
+        """Scans the workspace folder for `autoExclude`. The result is kept until the directory names change."""
+        wf_attr = self.wf_attrs[wf_path]
+        if (result := wf_attr.auto_exclude) and result.directory_names == directory_names:
+            return result
+        if future := self._prewarmed_auto_excludes.pop((wf_path, directory_names), None):
+            result = take_future_result(future, lambda: scan_auto_excludes(wf_path, directory_names=directory_names))
+        else:
+            result = scan_auto_excludes(wf_path, directory_names=directory_names)
+        wf_attr.auto_exclude = result
+        file_count = "" if result.pruned_file_count is None else f" ({result.pruned_file_count} files)"
+        log_info(
+            f"Excluded {result.pruned_dir_count} directories{file_count} "
+            f"from the analysis of {wf_path}: [{', '.join(result.patterns)}]"
+        )
+        return result
+
+    def provide_venv_python_path(
+        self,
+        configuration_proxy: ConfigurationProxy,
+        item: ConfigurationItem,
+        context: ConfigurationRequestContext,
     ) -> None:
-        python_section = ConfigurationSection("python")
-        pythonanalysis_section = ConfigurationSection("python.analysis")
-        if python_section in configuration_proxy.section or pythonanalysis_section in configuration_proxy.section:
-            workspace_uri = item.get("scopeUri", "")
-            file_path = uri_to_file_path(workspace_uri)
-            wf_path = find_workspace_folder(session.window, file_path) if file_path else None
-            # provide detected venv information
-            # note that `pyrightconfig.json` seems to be auto-prioritized by the server
-            if (venv_strategies := session.config.settings.get("venvStrategies")) and (
-                venv_info := find_venv_by_finder_names(venv_strategies, project_dir=wf_path, session=session)
-            ):
-                if wf_path:
-                    self.wf_attrs[wf_path].venv_info = venv_info
-                # When ST just starts, server session hasn't been created yet.
-                # So `on_activated` can't add full information for the initial view and hence we handle it here.
-                if active_view := sublime.active_window().active_view():
-                    active_view.run_command("lsp_pyright_update_view_status_text")
-                # modify configuration for the venv
-                if pythonanalysis_section in configuration_proxy.section:
-                    site_packages_dir = str(venv_info.site_packages_dir)
-                    extra_paths: list[str] = configuration_proxy.get("python.analysis.extraPaths")
-                    if site_packages_dir not in extra_paths:
-                        extra_paths.insert(0, site_packages_dir)
-                else:
-                    if not configuration_proxy.get("python.pythonPath"):
-                        configuration_proxy.set("python.pythonPath", str(venv_info.python_executable))
-
-    def patch_markdown_content(self, content: str) -> str:
-        # the fenced code blocks are not valid Python hence we use a custom syntax
-        content = re.sub("```python(?=\n)", "```pyright_python", content)
-        # add another linebreak before horizontal rule following fenced code block
-        content = re.sub("```\n---", "```\n\n---", content)
-        # add markup for some common field name conventions in function docstring
-        content = re.sub(
-            r"\n:(\w+)[ \t]+([\w\\*.]+):",
-            lambda m: "\n__{field}:__ `{name}`".format(
-                field=m.group(1).title(),
-                name=m.group(2).replace(R"\_", "_").replace(R"\*", "*"),
-            ),
-            content,
+        """Provides the detected venv. Note that `pyrightconfig.json` seems to be auto-prioritized by the server."""
+        # `extraPaths` is provided instead for sections which contain "python.analysis"
+        if PYTHON_ANALYSIS_SECTION in configuration_proxy.section:
+            return
+        if (venv_info := self.resolve_item_venv_info(item, context)) and not configuration_proxy.get(
+            "python.pythonPath"
+        ):
+            configuration_proxy.set("python.pythonPath", str(venv_info.python_executable))
+
+    def provide_extra_paths(
+        self,
+        configuration_proxy: ConfigurationProxy,
+        item: ConfigurationItem,
+        context: ConfigurationRequestContext,
+    ) -> None:
+        """Provides `extraPaths` composed from the user setting, the dev environment and the detected venv."""
+        # the value in the response has been resolved for the scope, e.g., `${folder}` has been expanded
+        user_layer = self.extra_paths.make_user_layer(
+            configuration_proxy.get(SERVER_SETTING_ANALYSIS_EXTRAPATHS) or [],
+        )
+        venv_layer = (
+            ExtraPathsLayer(f"venv:{venv_info.meta.finder_name}", (str(venv_info.site_packages_dir),), "prepend")
+            if (venv_info := self.resolve_item_venv_info(item, context))
+            else None
         )
-        content = re.sub(r"\n:returns?:", r"\n__Returns:__", content)
-        content = re.sub(r"\n:rtype:", r"\n__Returntype:__", content)
-        content = re.sub(r"\n:deprecated:", r"\n⚠️ __Deprecated:__", content)
-        return content
+        extra_paths = self.extra_paths.compose_paths(user_layer, venv_layer)
+        configuration_proxy.set(SERVER_SETTING_ANALYSIS_EXTRAPATHS, extra_paths)
+
+    def remove_default_stub_path(
+        self,
+        configuration_proxy: ConfigurationProxy,
+        item: ConfigurationItem,
+        context: ConfigurationRequestContext,
+    ) -> None:
+        # If stubPath is not set, remove it rather than sending default value.
+        # This lets the server know that it's unset rather than explicitly set to the default value (typings)
+        # so it can behave differently.
+        if configuration_proxy.get(SERVER_SETTING_ANALYSIS_STUBPATH) == "typings":
+            configuration_proxy.pop(SERVER_SETTING_ANALYSIS_STUBPATH)
+
+    def provide_auto_exclude(
+        self,
+        configuration_proxy: ConfigurationProxy,
+        item: ConfigurationItem,
+        context: ConfigurationRequestContext,
+    ) -> None:
+        """Provides `exclude` generated for the workspace folder unless the user or the project configures it."""
+        settings = context.session.config.settings
+        if not settings.get("autoExclude") or configuration_proxy.get(SERVER_SETTING_ANALYSIS_EXCLUDE):
+            return
+        if not (wf_path := self.resolve_item_workspace_folder(item, context)) or has_pyright_config_file(wf_path):
+            return
+        directory_names = tuple(settings.get("autoExcludeDirectories") or ())
+        configuration_proxy.set(
+            SERVER_SETTING_ANALYSIS_EXCLUDE,
+            self.resolve_auto_exclude(wf_path, directory_names).to_exclude(),
+        )
+
+    def log_extra_paths(self) -> None:
+        paths = ", ".join(self.extra_paths.dev_environment_layer.paths)
+        log_debug(f'"analysis.extraPaths" from the dev environment: [{paths}]')
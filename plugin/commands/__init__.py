@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 from .lsp_pyright_create_configuration import LspPyrightCreateConfigurationCommand
+from .lsp_pyright_refresh_dev_environment import LspPyrightRefreshDevEnvironmentCommand
+from .lsp_pyright_show_full_documentation import LspPyrightShowFullDocumentationCommand
+from .lsp_pyright_show_performance_report import LspPyrightShowPerformanceReportCommand
 from .lsp_pyright_update_status_text import LspPyrightUpdateViewStatusTextCommand
 
 __all__ = (
     # ST: commands
     "LspPyrightCreateConfigurationCommand",
+    "LspPyrightRefreshDevEnvironmentCommand",
+    "LspPyrightShowFullDocumentationCommand",
+    "LspPyrightShowPerformanceReportCommand",
     "LspPyrightUpdateViewStatusTextCommand",
 )
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import final
+
+from LSP.plugin import LspWindowCommand
+
+from ..client import LspPyrightPlugin
+from ..constants import PACKAGE_NAME
+from ..dev_environment.interfaces import get_probe_cache
+from ..utils_lsp import send_did_change_configuration
+
+
+@final
+class LspPyrightRefreshDevEnvironmentCommand(LspWindowCommand):
+    """Forgets cached results of probing dev environment binaries (e.g., Blender) and probes them again."""
+
+    session_name = PACKAGE_NAME
+
+    def run(self) -> None:
+        get_probe_cache(LspPyrightPlugin.plugin_storage_path).clear()
+        if session := self.session():
+            send_did_change_configuration(session)
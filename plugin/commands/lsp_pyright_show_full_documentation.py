@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import final
+
+import sublime
+import sublime_plugin
+
+from ..constants import PACKAGE_NAME
+from ..markdown import FULL_DOCUMENTATION_STORE, patch_markdown_content
+
+
+@final
+class LspPyrightShowFullDocumentationCommand(sublime_plugin.WindowCommand):
+    """Shows documentation which has been truncated by the "documentationSizeLimit" setting in a new view."""
+
+    def run(self, doc_id: str) -> None:
+        if (content := FULL_DOCUMENTATION_STORE.get(doc_id)) is None:
+            sublime.status_message(f"{PACKAGE_NAME}: The documentation is no longer available.")
+            return
+
+        view = self.window.new_file()
+        view.set_name(f"{PACKAGE_NAME}: Documentation")
+        view.set_scratch(True)
+        view.assign_syntax("Packages/Markdown/Markdown.sublime-syntax")
+        view.run_command("append", {"characters": patch_markdown_content(content)})
+        view.set_read_only(True)
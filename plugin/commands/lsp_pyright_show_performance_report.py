@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import final
+
+import sublime_plugin
+
+from ..constants import PACKAGE_NAME
+from ..markdown import MARKDOWN_CACHE
+from ..perf import PERF_RECORDER
+from ..process_runner import PROCESS_RUNNER
+
+OUTPUT_PANEL_NAME = f"{PACKAGE_NAME} Performance"
+
+
+@final
+class LspPyrightShowPerformanceReportCommand(sublime_plugin.WindowCommand):
+    """Shows timings recorded by the "performanceInstrumentation" setting in an output panel."""
+
+    def run(self, clear: bool = False) -> None:
+        if clear:
+            PERF_RECORDER.clear()
+
+        panel = self.window.create_output_panel(OUTPUT_PANEL_NAME)
+        panel.settings().set("word_wrap", False)
+        panel.run_command("append", {"characters": self.render_report()})
+        self.window.run_command("show_panel", {"panel": f"output.{OUTPUT_PANEL_NAME}"})
+
+    @staticmethod
+    def render_report() -> str:
+        lines: list[str] = []
+        if not PERF_RECORDER.enabled:
+            lines += (
+                'Timings are not recorded. Set "performanceInstrumentation" to true in the LSP-pyright settings.',
+                "",
+            )
+
+        lines.append(f"{'name':<60} {'count':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} {'max (ms)':>10}")
+        for summary in PERF_RECORDER.summaries():
+            lines.append(
+                f"{summary.name:<60} {summary.count:>8} {summary.p50 * 1e3:>10.2f}"
+                f" {summary.p95 * 1e3:>10.2f} {summary.max * 1e3:>10.2f}"
+            )
+
+        markdown_cache_stats = ", ".join(f"{key} = {value:g}" for key, value in MARKDOWN_CACHE.stats().items())
+        lines += ("", f"Markdown cache: {markdown_cache_stats}", "", "Recent processes:")
+        for record in reversed(PROCESS_RUNNER.records):
+            status = "timed out" if record.timed_out else f"exit code {record.returncode}"
+            lines.append(f"  {record.duration * 1e3:>10.2f} ms  {status:<14} {record.command}")
+
+        return "\n".join(lines) + "\n"
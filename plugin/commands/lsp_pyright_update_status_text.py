@@ -1,21 +1,65 @@
 from __future__ import annotations
 
+from dataclasses import asdict
+from functools import lru_cache
 from typing import Any, final
+from weakref import WeakKeyDictionary
 
 import sublime
-from LSP.plugin import LspTextCommand
+from LSP.plugin import LspTextCommand, Session
 from typing_extensions import override
 
 from ..client import LspPyrightPlugin
 from ..log import log_warning
+from ..server_process import ServerStats, template_uses_server_stats
 from ..template import load_string_template
 from ..utils_lsp import find_workspace_folder
 
+STATUS_TEXT_DEBOUNCE_MS = 50
+"""Requests to update the status text within this period are coalesced into one."""
+
+_debounce_tokens: dict[int, int] = {}
+"""View ID => the token of the latest request to update the status text."""
+_pushed_status_texts: WeakKeyDictionary[Session, str] = WeakKeyDictionary()
+"""The status text which has been pushed to the session."""
+
+
+@lru_cache(maxsize=64)
+def render_status_text(
+    template_text: str,
+    server_version: str,
+    venv: tuple[tuple[str, str], ...] | None,
+    server: ServerStats | None = None,
+) -> str:
+    variables: dict[str, Any] = {
+        "server_version": server_version,
+    }
+    if venv is not None:
+        variables["venv"] = dict(venv)
+    if server is not None:
+        variables["server"] = asdict(server)
+
+    try:
+        return load_string_template(template_text).render(variables)
+    except Exception as e:
+        log_warning(f'Invalid "statusText" template: {e}')
+    return ""
+
 
 @final
 class LspPyrightUpdateViewStatusTextCommand(LspTextCommand):
     @override
     def run(self, edit: sublime.Edit) -> None:
+        # focus changes and configuration requests may fire this many times in a row
+        view_id = self.view.id()
+        token = _debounce_tokens[view_id] = _debounce_tokens.get(view_id, 0) + 1
+        sublime.set_timeout_async(lambda: self.update_status_text_async(token), STATUS_TEXT_DEBOUNCE_MS)
+
+    def update_status_text_async(self, token: int) -> None:
+        if _debounce_tokens.get(view_id := self.view.id()) != token:
+            return  # superseded by a later request
+        del _debounce_tokens[view_id]
+
         session = self.session_by_name()
         if session is None:
             return
@@ -25,28 +69,32 @@ class LspPyrightUpdateViewStatusTextCommand(LspTextCommand):
 
         # shortcut if the user doesn't want any status text
         if not (template_text := session.config.settings.get("statusText")):
-            session.set_config_status_async("")
+            self.push_status_text(session, "")
             return
 
-        variables: dict[str, Any] = {
-            "server_version": LspPyrightPlugin.server_version,
-        }
-
+        venv: tuple[tuple[str, str], ...] | None = None
         if (
             (wf_path := find_workspace_folder(window, file_path))
             and (wf_attr := LspPyrightPlugin.wf_attrs.get(wf_path))
             and (venv_info := wf_attr.venv_info)
         ):
-            variables["venv"] = {
-                "finder_name": venv_info.meta.finder_name,
-                "python_version": venv_info.python_version,
-                "venv_prompt": venv_info.prompt,
-            }
-
-        rendered_text = ""
-        try:
-            rendered_text = load_string_template(template_text).render(variables)
-        except Exception as e:
-            log_warning(f'Invalid "statusText" template: {e}')
-
-        session.set_config_status_async(rendered_text)
+            venv = (
+                ("finder_name", venv_info.meta.finder_name),
+                ("python_version", venv_info.python_version),
+                ("venv_prompt", venv_info.prompt),
+            )
+
+        server: ServerStats | None = None
+        if template_uses_server_stats(template_text):
+            server = LspPyrightPlugin.server_stats.get(session) or ServerStats()
+
+        self.push_status_text(
+            session,
+            render_status_text(template_text, LspPyrightPlugin.server_version, venv, server),
+        )
+
+    @staticmethod
+    def push_status_text(session: Session, text: str) -> None:
+        if _pushed_status_texts.get(session) != text:
+            _pushed_status_texts[session] = text
+            session.set_config_status_async(text)
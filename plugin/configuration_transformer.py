@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Callable, Generic, Hashable, TypeVar
+
+from LSP.protocol import ConfigurationItem, LSPAny
+
+from .utils_lsp import ConfigurationProxy, ConfigurationSection, parse_configuration_section
+
+_C = TypeVar("_C")
+
+ConfigurationRule = Callable[[ConfigurationProxy, ConfigurationItem, _C], None]
+"""A rule which rewrites the configuration of an item in place. The last argument is the per-response context."""
+
+
+class ConfigurationTransformer(Generic[_C]):
+    """
+    Applies rewrite rules to configurations of a `workspace/configuration` response in a single pass.
+
+    A rule is registered against a section, which is parsed only once, and it's only applied to items
+    whose sections overlap with it. E.g., a rule of "python.analysis" applies to "python" and "python.analysis" items.
+
+    If a `revision` is given, the transformed configuration is memoized per `(section, scopeUri)` until the revision
+    changes. The revision must change whenever anything that rules or the untransformed configuration depend on changes.
+    """
+
+    def __init__(self) -> None:
+        self._rules: list[tuple[ConfigurationSection, ConfigurationRule[_C]]] = []
+        self._memo: dict[tuple[str | None, str | None], dict[str, LSPAny]] = {}
+        self._memo_revision: Hashable = None
+
+    def register(self, section: str, rule: ConfigurationRule[_C]) -> None:
+        """Registers a rule. Rules are applied in the registration order."""
+        self._rules.append((parse_configuration_section(section), rule))
+
+    def transform(
+        self,
+        items: list[ConfigurationItem],
+        configurations: list[LSPAny],
+        context: _C,
+        *,
+        revision: Hashable = None,
+    ) -> bool:
+        """
+        Transforms `configurations` in place. Returns whether any memoized configuration has been reused,
+        in which case rules have not been applied to that item so they have left nothing in `context` for it.
+        """
+        if revision is None or revision != self._memo_revision:
+            self._memo.clear()
+            self._memo_revision = revision
+
+        is_memo_used = False
+        for i, item in enumerate(items):
+            if not isinstance(configuration := configurations[i], dict):
+                continue
+            memo_key = (item.get("section"), item.get("scopeUri"))
+            if revision is not None and (memoized := self._memo.get(memo_key)) is not None:
+                configurations[i] = memoized
+                is_memo_used = True
+                continue
+
+            proxy = ConfigurationProxy(configuration, parse_configuration_section(item.get("section")))
+            for rule_section, rule in self._rules:
+                if rule_section in proxy.section or proxy.section in rule_section:
+                    rule(proxy, item, context)
+
+            if revision is not None:
+                self._memo[memo_key] = configuration
+        return is_memo_used
@@ -4,5 +4,7 @@ assert __package__
 
 PACKAGE_NAME = __package__.partition(".")[0]
 
+SERVER_SETTING_ANALYSIS_EXCLUDE = "python.analysis.exclude"
 SERVER_SETTING_ANALYSIS_EXTRAPATHS = "python.analysis.extraPaths"
+SERVER_SETTING_ANALYSIS_STUBPATH = "python.analysis.stubPath"
 SERVER_SETTING_DEV_ENVIRONMENT = "pyright.dev_environment"
@@ -3,8 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Generator, Sequence
 
-from more_itertools import first_true
-
+from ..utils import first_true
 from .impl import (
     BlenderDevEnvironmentHandler,
     GdbDevEnvironmentHandler,
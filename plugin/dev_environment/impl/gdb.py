@@ -7,7 +7,8 @@ from pathlib import Path
 from LSP.plugin import DottedDict
 from typing_extensions import override
 
-from ...utils import run_shell_command
+from ...extra_paths import ExtraPathsLayer
+from ...process_runner import ProcessOptions, run_process
 from ..interfaces import BaseDevEnvironmentHandler
 
 
@@ -17,11 +18,14 @@ class GdbDevEnvironmentHandler(BaseDevEnvironmentHandler):
         return "gdb"
 
     @override
-    def resolve_extra_paths_(self, *, settings: DottedDict) -> list[str]:
-        return self._resolve_paths(settings=settings, paths=self.find_paths(settings))
+    def resolve_extra_paths_(self, *, settings: DottedDict) -> ExtraPathsLayer:
+        binary = self.get_dev_environment_subsetting(settings, "binary")
+        process_options = ProcessOptions.from_settings(settings)
+        paths = self.probe_binary(binary, lambda binary: self.find_paths(binary, process_options))
+        return self._resolve_paths(paths=paths)
 
     @classmethod
-    def find_paths(cls, settings: DottedDict) -> list[str]:
+    def find_paths(cls, binary: str, process_options: ProcessOptions | None = None) -> list[str]:
         with tempfile.TemporaryDirectory() as tmpdir:
             filepath = Path(tmpdir) / "print_sys_path.commands"
             filepath.write_text(
@@ -36,12 +40,12 @@ exit
                 encoding="utf-8",
             )
             args = (
-                cls.get_dev_environment_subsetting(settings, "binary"),
+                binary,
                 "--batch",
                 "--command",
                 str(filepath),
             )
-            result = run_shell_command(args, shell=False)
+            result = run_process(args, shell=False, options=process_options)
 
         if not result or result[2] != 0:
             raise RuntimeError(f"Failed to run command: {args}")
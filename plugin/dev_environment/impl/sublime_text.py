@@ -11,9 +11,10 @@ from typing import Generator, Tuple, TypeVar
 import sublime
 from LSP.plugin import DottedDict
 from LSP.plugin.core.constants import ST_VERSION
-from more_itertools import first_true
 from typing_extensions import TypeAlias, override
 
+from ...extra_paths import ExtraPathsLayer
+from ...utils import first_true
 from ..interfaces import BaseDevEnvironmentHandler
 
 T = TypeVar("T")
@@ -44,8 +45,8 @@ class BaseVersionedSublimeTextDevEnvironmentHandler(BaseDevEnvironmentHandler, A
         return cls.python_version >= wanted_version
 
     @override
-    def resolve_extra_paths_(self, *, settings: DottedDict) -> list[str]:
-        return self._resolve_paths(settings=settings, paths=self.find_package_dependency_dirs())
+    def resolve_extra_paths_(self, *, settings: DottedDict) -> ExtraPathsLayer:
+        return self._resolve_paths(paths=self.find_package_dependency_dirs())
 
     def find_package_dependency_dirs(self) -> list[str]:
         dep_dirs = sys.path.copy()
@@ -137,7 +138,7 @@ class SublimeTextDevEnvironmentHandler(BaseDevEnvironmentHandler):
         return "sublime_text"
 
     @override
-    def resolve_extra_paths_(self, *, settings: DottedDict) -> list[str]:
+    def resolve_extra_paths_(self, *, settings: DottedDict) -> ExtraPathsLayer:
         handler_cls = self.resolve_handler_cls(self.detect_project_python_version())
         handler = handler_cls(package_storage_path=self.package_storage_path, workspace_folders=self.workspace_folders)
         return handler.resolve_extra_paths(settings=settings)
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import shutil
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Iterable, Literal, Sequence, final
+from typing import Any, Callable, Iterable, Sequence, final
 
 from LSP.plugin import DottedDict
-from more_itertools import unique_everseen
 
-from ..constants import SERVER_SETTING_ANALYSIS_EXTRAPATHS, SERVER_SETTING_DEV_ENVIRONMENT
+from ..cache import JsonFileCache, get_json_file_cache
+from ..constants import SERVER_SETTING_DEV_ENVIRONMENT
+from ..extra_paths import ExtraPathsLayer, ExtraPathsOperation
 from ..log import log_debug
+from ..perf import PERF_RECORDER
+from ..utils import file_signature, unique_everseen
+
+
+def get_probe_cache(package_storage_path: Path) -> JsonFileCache:
+    """The persistent cache of results from probing binaries of dev environments."""
+    return get_json_file_cache(package_storage_path / "caches" / "dev_environment.json")
 
 
 class BaseDevEnvironmentHandler(ABC):
@@ -35,33 +44,45 @@ class BaseDevEnvironmentHandler(ABC):
         return cls.name() == dev_environment
 
     @final
-    def resolve_extra_paths(self, *, settings: DottedDict) -> list[str]:
-        """Returns resolved `extraPaths` including `current_paths` for the environment."""
-        return self.resolve_extra_paths_(settings=settings)
+    def probe_binary(self, binary: str, probe: Callable[[str], list[str]]) -> list[str]:
+        """
+        Returns `probe(binary)`, which is expensive, for example, starting Blender.
+
+        The result is cached on disk and reused until the resolved binary is modified.
+        """
+        try:
+            binary_path = Path(shutil.which(binary) or binary).resolve()
+        except OSError:
+            return probe(binary)
+        if not (signature := file_signature(binary_path)):
+            return probe(binary)
+
+        cache = get_probe_cache(self.package_storage_path)
+        cache_key = f"{self.name()}:{binary_path}"
+        if (entry := cache.get(cache_key)) and entry.get("signature") == list(signature):
+            return entry["paths"]
+
+        paths = probe(binary)
+        cache.set(cache_key, {"signature": list(signature), "paths": paths})
+        return paths
+
+    @final
+    def resolve_extra_paths(self, *, settings: DottedDict) -> ExtraPathsLayer:
+        """Returns the `extraPaths` layer of the environment, which doesn't include paths from other sources."""
+        with PERF_RECORDER.measure("dev_environment", self.name()):
+            return self.resolve_extra_paths_(settings=settings)
 
     @abstractmethod
-    def resolve_extra_paths_(self, *, settings: DottedDict) -> list[str]:
+    def resolve_extra_paths_(self, *, settings: DottedDict) -> ExtraPathsLayer:
         """Handle this environment. (subclass)"""
 
     def _resolve_paths(
         self,
         *,
-        settings: DottedDict,
         paths: Iterable[str | Path],
-        operation: Literal["append", "prepend", "replace"] = "append",
-    ) -> list[str]:
-        """Injects the given `paths` to `XXX.analysis.extraPaths` setting."""
-        current_paths: list[str] = settings.get(SERVER_SETTING_ANALYSIS_EXTRAPATHS) or []
-        extra_paths = list(map(str, paths))
-        if operation == "prepend":
-            resolved_paths = extra_paths + current_paths
-        elif operation == "append":
-            resolved_paths = current_paths + extra_paths
-        elif operation == "replace":
-            resolved_paths = extra_paths
-        else:
-            raise ValueError(f"Invalid operation: {operation}")
-
-        resolved_paths = list(map(str, unique_everseen(resolved_paths, key=Path)))  # deduplication
-        log_debug(f'Due to "dev_environment", new "analysis.extraPaths" is ({operation = }): {resolved_paths}')
-        return resolved_paths
+        operation: ExtraPathsOperation = "append",
+    ) -> ExtraPathsLayer:
+        """Makes the `extraPaths` layer, whose `paths` are combined with the user's `extraPaths` by `operation`."""
+        resolved_paths = tuple(map(str, unique_everseen(paths, key=Path)))  # deduplication
+        log_debug(f'Due to "dev_environment", "analysis.extraPaths" layer is ({operation = }): {resolved_paths}')
+        return ExtraPathsLayer(f"dev_environment:{self.name()}", resolved_paths, operation)
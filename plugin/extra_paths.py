@@ -0,0 +1,75 @@
+"""Composition of `python.analysis.extraPaths` from layers of different sources."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Literal
+
+from .utils import unique_everseen
+
+ExtraPathsOperation = Literal["append", "prepend", "replace"]
+
+
+@dataclass(frozen=True)
+class ExtraPathsLayer:
+    source: str
+    """Where paths come from. E.g., `"user"`, `"dev_environment:blender"` or `"venv:poetry"`."""
+    paths: tuple[str, ...] = ()
+    """The paths of this layer."""
+    operation: ExtraPathsOperation = "append"
+    """How paths are combined with paths of lower layers."""
+
+
+class ExtraPathsComposer:
+    """
+    Composes `extraPaths` from layers, from the lowest: the user setting, the dev environment and the detected venv.
+
+    The user layer is the value which the server has resolved for the requested scope, so the session settings
+    are never modified and no matter how many times the configuration is changed,
+    the composed result stays the same as long as layers stay the same.
+    Composed results are memoized until the dev environment layer changes.
+    """
+
+    def __init__(self) -> None:
+        self.dev_environment_layer = ExtraPathsLayer("dev_environment")
+        self._composed: dict[tuple[ExtraPathsLayer, ExtraPathsLayer | None], tuple[tuple[str, str], ...]] = {}
+        """(The user layer, the venv layer) => composed `(path, source)` pairs."""
+
+    @staticmethod
+    def make_user_layer(paths: Iterable[str]) -> ExtraPathsLayer:
+        return ExtraPathsLayer("user", tuple(map(str, paths)))
+
+    def set_dev_environment_layer(self, layer: ExtraPathsLayer | None) -> bool:
+        """Returns whether the layer has changed."""
+        if (layer := layer or ExtraPathsLayer("dev_environment")) == self.dev_environment_layer:
+            return False
+        self.dev_environment_layer = layer
+        self._composed.clear()
+        return True
+
+    def compose(
+        self,
+        user_layer: ExtraPathsLayer,
+        venv_layer: ExtraPathsLayer | None = None,
+    ) -> tuple[tuple[str, str], ...]:
+        """Returns deduplicated `(path, source)` pairs. For duplicated paths, the first one wins."""
+        if (composed := self._composed.get(key := (user_layer, venv_layer))) is None:
+            pairs: list[tuple[str, str]] = []
+            for layer in (user_layer, self.dev_environment_layer, venv_layer):
+                if not layer:
+                    continue
+                layer_pairs = [(path, layer.source) for path in layer.paths]
+                if layer.operation == "prepend":
+                    pairs = layer_pairs + pairs
+                elif layer.operation == "append":
+                    pairs = pairs + layer_pairs
+                elif layer.operation == "replace":
+                    pairs = layer_pairs
+                else:
+                    raise ValueError(f"Invalid operation: {layer.operation}")
+            composed = self._composed[key] = tuple(unique_everseen(pairs, key=lambda pair: Path(pair[0])))
+        return composed
+
+    def compose_paths(self, user_layer: ExtraPathsLayer, venv_layer: ExtraPathsLayer | None = None) -> list[str]:
+        return [path for path, _ in self.compose(user_layer, venv_layer)]
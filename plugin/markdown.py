@@ -0,0 +1,207 @@
+"""Post-processing of the markdown content from the server."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sys
+from collections import OrderedDict
+
+FENCE_REPLACEMENTS = (
+    # the fenced code blocks are not valid Python hence we use a custom syntax
+    ("```python\n", "```pyright_python\n"),
+    # add another linebreak before horizontal rule following fenced code block
+    ("```\n---", "```\n\n---"),
+)
+"""Literal replacements, which are much faster with `str.replace` than with a regex."""
+
+FIELD_LIST_RE = re.compile(
+    r"\n:(?:"
+    r"(?P<field_list>(?P<field>\w+)[ \t]+(?P<name>[\w\\*.]+):)"
+    r"|(?P<returns>returns?:)"
+    r"|(?P<rtype>rtype:)"
+    r"|(?P<deprecated>deprecated:)"
+    r")"
+)
+"""
+Common field name conventions in function docstring.
+
+All alternatives share the `\\n:` prefix so the content is scanned only once with a fast prefix search.
+Matches of these alternatives never overlap with each other,
+so the result is the same as applying them one by one.
+"""
+
+FIELD_LIST_REPLACEMENTS = {
+    "returns": "\n__Returns:__",
+    "rtype": "\n__Returntype:__",
+    "deprecated": "\n⚠️ __Deprecated:__",
+}
+
+
+def _rewrite_field_list(m: re.Match[str]) -> str:
+    # `lastgroup` is the outermost group of the matched alternative
+    if replacement := FIELD_LIST_REPLACEMENTS.get(m.lastgroup or ""):
+        return replacement
+    field = m.group("field").title()
+    name = m.group("name").replace(R"\_", "_").replace(R"\*", "*")
+    return f"\n__{field}:__ `{name}`"
+
+
+def patch_markdown_content(content: str) -> str:
+    """Makes the markdown content from the server look better in ST."""
+    if "```" in content:
+        for old, new in FENCE_REPLACEMENTS:
+            content = content.replace(old, new)
+    if "\n:" in content:
+        content = FIELD_LIST_RE.sub(_rewrite_field_list, content)
+    return content
+
+
+def truncate_markdown_content(content: str, size_limit: int) -> str:
+    """
+    Returns the leading part of the content which is at most `size_limit` characters long.
+
+    The content is cut at a paragraph boundary if there is one in the latter half of the limit, otherwise at a line
+    boundary, and never inside a fenced code block unless a block alone exceeds the limit,
+    in which case the block is closed right after the cut. If not even half of the limit can be kept that way,
+    e.g., the first line alone exceeds the limit, the content is cut right at the limit.
+    """
+    if len(content) <= size_limit:
+        return content
+
+    head = content[:size_limit]
+    in_fence = False
+    line_end = line_cut = paragraph_cut = 0
+    for line in head.splitlines(keepends=True):
+        if not line.endswith("\n"):
+            break  # a partial line at the end
+        line_end += len(line)
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence:
+            line_cut = line_end
+            if not line.strip():
+                paragraph_cut = line_end
+
+    if paragraph_cut >= size_limit // 2:
+        return head[:paragraph_cut]
+    if line_cut >= size_limit // 2:
+        return head[:line_cut]
+    # a fenced code block alone exceeds the limit
+    if line_end > size_limit // 2:
+        return head[:line_end] + ("```\n" if in_fence else "")
+    # a single line is too long so it's cut in the middle
+    if head[line_end:].lstrip().startswith("```"):
+        in_fence = not in_fence
+    return head + ("\n```\n" if in_fence else "")
+
+
+class FullDocumentationStore:
+    """
+    A bounded LRU store of documentation which has been truncated, keyed by the hash of the raw content.
+
+    The full documentation is only formatted when the user asks for it via the link appended to the truncated one.
+    """
+
+    def __init__(self, max_entries: int = 16) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def add(self, content: str) -> str:
+        """Stores the raw content and returns its ID."""
+        doc_id = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        self._entries[doc_id] = content
+        self._entries.move_to_end(doc_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return doc_id
+
+    def get(self, doc_id: str) -> str | None:
+        return self._entries.get(doc_id)
+
+
+class MarkdownCache:
+    """
+    A bounded LRU cache of patched markdown content, keyed by the raw content.
+
+    The server keeps sending identical documentation (e.g., signature help on every keystroke inside a call)
+    so identical content is patched only once. The raw content is used as the key directly since hashing a `str`
+    is much cheaper than a cryptographic digest of its encoded bytes, which would make small lookups slower
+    than patching.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        """The maximum number of cached entries. Non-positive means the cache is disabled."""
+        self.hits = 0
+        """The number of times a cached result has been used."""
+        self.misses = 0
+        """The number of times the content has to be patched."""
+        self.memory_bytes = 0
+        """The approximate memory used by cached results."""
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def patch(self, content: str) -> str:
+        """Same as `patch_markdown_content` but the result is cached."""
+        if self.max_entries <= 0:
+            return patch_markdown_content(content)
+
+        if (patched := self._entries.get(content)) is not None:
+            self.hits += 1
+            self._entries.move_to_end(content)
+            return patched
+
+        self.misses += 1
+        patched = self._entries[content] = patch_markdown_content(content)
+        self.memory_bytes += sys.getsizeof(content) + sys.getsizeof(patched)
+        self._evict(self.max_entries)
+        return patched
+
+    def resize(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._evict(max(0, max_entries))
+
+    def clear(self) -> None:
+        self._evict(0)
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_bytes": self.memory_bytes,
+        }
+
+    def _evict(self, max_entries: int) -> None:
+        while len(self._entries) > max_entries:
+            content, patched = self._entries.popitem(last=False)
+            self.memory_bytes -= sys.getsizeof(content) + sys.getsizeof(patched)
+
+
+MARKDOWN_CACHE = MarkdownCache()
+"""The patched markdown cache shared by hover, completion resolve and signature help."""
+
+FULL_DOCUMENTATION_STORE = FullDocumentationStore()
+"""The raw content of truncated documentation, which is shown by `lsp_pyright_show_full_documentation`."""
+
+
+def patch_documentation(content: str, *, size_limit: int = 0) -> str:
+    """
+    Same as `MarkdownCache.patch` with `MARKDOWN_CACHE` but the content is truncated to `size_limit` characters first,
+    so only the displayed part is patched. A non-positive `size_limit` means no limit.
+    """
+    if size_limit <= 0 or len(content) <= size_limit:
+        return MARKDOWN_CACHE.patch(content)
+
+    displayed = truncate_markdown_content(content, size_limit)
+    doc_id = FULL_DOCUMENTATION_STORE.add(content)
+    command = f"subl:lsp_pyright_show_full_documentation {json.dumps({'doc_id': doc_id})}"
+    return (
+        f"{MARKDOWN_CACHE.patch(displayed).rstrip()}\n\n"
+        f"*Truncated {len(content) - len(displayed):,} characters.* [Show full documentation](<{command}>)"
+    )
@@ -0,0 +1,129 @@
+"""Sizing the V8 heap of the language server from the workspace size and the system memory."""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from .virtual_env.venv_info import list_venv_info_classes
+
+MIN_MAX_OLD_SPACE_SIZE_MB = 2048
+"""The heap size which is needed regardless of the number of Python files."""
+MAX_OLD_SPACE_SIZE_MB_PER_FILE = 0.5
+"""The heap size which is added per Python file in workspace folders."""
+NODE_MAX_DEFAULT_OLD_SPACE_SIZE_MB = 4096
+"""The upper bound of the default heap size which V8 picks on 64-bit systems."""
+
+
+@dataclass
+class SystemMemory:
+    total: int
+    """The physical memory in bytes."""
+    available: int
+    """The memory which can be used without swapping in bytes. Same as `total` if it's unknown."""
+
+
+def get_system_memory() -> SystemMemory | None:
+    if sys.platform == "linux":
+        meminfo: dict[str, int] = {}
+        try:
+            with open("/proc/meminfo", encoding="utf-8") as f:
+                for line in f:
+                    name, _, value = line.partition(":")
+                    meminfo[name] = int(value.split()[0]) * 1024  # kB
+        except (OSError, IndexError, ValueError):
+            return None
+        if not (total := meminfo.get("MemTotal")):
+            return None
+        return SystemMemory(total=total, available=meminfo.get("MemAvailable", total))
+
+    if os.name == "nt":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):  # type: ignore
+            return None
+        return SystemMemory(total=status.ullTotalPhys, available=status.ullAvailPhys)
+
+    try:
+        total = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+    return SystemMemory(total=total, available=total)
+
+
+def count_python_files(folders: Iterable[str | Path], *, ignores: Collection[str] = (), max_count: int = 0) -> int:
+    """
+    Counts Python files (`.py` and `.pyi`) in folders recursively.
+
+    Hidden directories, directories in `ignores` and virtual environments are skipped since the server doesn't
+    analyze them as a part of the workspace. If `max_count` is positive, counting stops at it.
+    """
+    marker_names = tuple(venv_info_cls.marker_name for venv_info_cls in list_venv_info_classes())
+    count = 0
+    stack = [str(folder) for folder in folders]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        if any(entry.name in marker_names for entry in entries):
+            continue  # a virtual environment
+        for entry in entries:
+            if entry.name.startswith(".") or entry.name in ignores:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith((".py", ".pyi")):
+                    count += 1
+                    if 0 < max_count <= count:
+                        return count
+            except OSError:
+                continue
+    return count
+
+
+def estimate_node_default_max_old_space_size(system_memory: SystemMemory | None) -> int:
+    """
+    Estimates the default heap size of Node in MB, which V8 picks as a quarter of the physical memory
+    but not more than `NODE_MAX_DEFAULT_OLD_SPACE_SIZE_MB`. The upper bound is assumed if the memory is unknown.
+    """
+    if not system_memory:
+        return NODE_MAX_DEFAULT_OLD_SPACE_SIZE_MB
+    return min(system_memory.total // 4 // (1024 * 1024), NODE_MAX_DEFAULT_OLD_SPACE_SIZE_MB)
+
+
+def compute_max_old_space_size(python_file_count: int, system_memory: SystemMemory | None) -> int:
+    """
+    Picks `--max-old-space-size` in MB for the workspace. `0` means Node's default should be used.
+
+    The heap grows with the number of Python files but it never exceeds half of the physical memory
+    nor the currently available memory, so that the server crashes less likely than it thrashes the system.
+    Only Python files in workspace folders are counted (not `site-packages`) so a size which isn't larger than
+    Node's default is never picked. Node's default is used instead.
+    """
+    size = MIN_MAX_OLD_SPACE_SIZE_MB + int(python_file_count * MAX_OLD_SPACE_SIZE_MB_PER_FILE)
+    if system_memory:
+        size = min(size, min(system_memory.total // 2, system_memory.available) // (1024 * 1024))
+    if size <= estimate_node_default_max_old_space_size(system_memory):
+        return 0
+    return size
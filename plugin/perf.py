@@ -0,0 +1,157 @@
+"""Opt-in timing instrumentation of hot paths."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import ContextManager, Hashable, Sequence
+
+
+def nearest_rank_percentile(sorted_values: Sequence[float], percent: float) -> float:
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[int(index)]
+
+
+@dataclass
+class PerfSummary:
+    name: str
+    """The name of the measured code path."""
+    count: int
+    """The number of calls since the recorder has been cleared."""
+    p50: float
+    """The median duration in seconds among recent samples."""
+    p95: float
+    """The 95th percentile duration in seconds among recent samples."""
+    max: float
+    """The maximum duration in seconds among recent samples."""
+
+
+class _Measurement:
+    __slots__ = ("recorder", "name", "start_time")
+
+    def __init__(self, recorder: PerfRecorder, name: str) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.start_time = 0.0
+
+    def __enter__(self) -> None:
+        self.start_time = time.perf_counter()
+
+    def __exit__(self, *args: object) -> None:
+        self.recorder.record(self.name, time.perf_counter() - self.start_time)
+
+
+class PerfRecorder:
+    """
+    Records durations of named code paths.
+
+    It's disabled by default. When disabled, `measure()` returns a shared no-op context manager
+    so instrumented code paths only pay for a function call.
+    """
+
+    MAX_SAMPLES = 1000
+    """The number of recent samples kept per name, which percentiles are calculated from."""
+
+    _NULL_CONTEXT: ContextManager[None] = nullcontext()
+
+    def __init__(self) -> None:
+        self.enabled = False
+        """Whether durations are recorded."""
+        self._samples: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def measure(self, *name_parts: str) -> ContextManager[None]:
+        """
+        Returns a context manager which records the duration of its body.
+
+        The name is joined from `name_parts` with `:`, only if the recorder is enabled.
+        """
+        if not self.enabled:
+            return self._NULL_CONTEXT
+        return _Measurement(self, ":".join(name_parts))
+
+    def record(self, name: str, duration: float) -> None:
+        with self._lock:
+            if (samples := self._samples.get(name)) is None:
+                samples = self._samples[name] = deque(maxlen=self.MAX_SAMPLES)
+            samples.append(duration)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def summaries(self) -> list[PerfSummary]:
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+        summaries: list[PerfSummary] = []
+        for name, durations in sorted(snapshot.items()):
+            summaries.append(
+                PerfSummary(
+                    name=name,
+                    count=counts[name],
+                    p50=nearest_rank_percentile(durations, 50),
+                    p95=nearest_rank_percentile(durations, 95),
+                    max=durations[-1],
+                )
+            )
+        return summaries
+
+
+PERF_RECORDER = PerfRecorder()
+"""The recorder shared by all instrumented code paths."""
+
+
+class RequestTracker:
+    """
+    Tracks requests to the server which are waiting for responses and latencies of recent ones. It's always enabled.
+
+    A response is paired with the request of the same ID, or with the oldest request of the same method
+    if the ID is unknown. Requests without responses (e.g., cancelled ones) are dropped after `STALE_TIMEOUT`.
+    """
+
+    MAX_SAMPLES = 100
+    """The number of recent latencies kept per method."""
+    STALE_TIMEOUT = 30.0
+    """Seconds after which a request without a response is no longer counted as in-flight."""
+
+    def __init__(self) -> None:
+        self._pending: dict[str, OrderedDict[Hashable, float]] = {}
+        self._latencies: dict[str, deque[float]] = {}
+        self._sequence = 0
+
+    def start(self, method: str, request_id: Hashable = None) -> None:
+        if request_id is None:
+            self._sequence += 1
+            request_id = ("sequence", self._sequence)
+        self._pending.setdefault(method, OrderedDict())[request_id] = time.perf_counter()
+
+    def finish(self, method: str, request_id: Hashable = None) -> None:
+        if not (pending := self._pending.get(method)):
+            return
+        if request_id is not None and request_id in pending:
+            start_time = pending.pop(request_id)
+        else:
+            _, start_time = pending.popitem(last=False)
+        if (latencies := self._latencies.get(method)) is None:
+            latencies = self._latencies[method] = deque(maxlen=self.MAX_SAMPLES)
+        latencies.append(time.perf_counter() - start_time)
+
+    def pending_count(self) -> int:
+        deadline = time.perf_counter() - self.STALE_TIMEOUT
+        for pending in self._pending.values():
+            while pending and next(iter(pending.values())) < deadline:
+                pending.popitem(last=False)
+        return sum(map(len, self._pending.values()))
+
+    def latency_percentile(self, method: str, percent: float) -> float | None:
+        """The latency percentile in seconds among recent responses. `None` if there is no response yet."""
+        if not (latencies := self._latencies.get(method)):
+            return None
+        return nearest_rank_percentile(sorted(latencies), percent)
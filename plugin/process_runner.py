@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar, Mapping, Sequence
+
+from LSP.plugin import DottedDict
+
+from .log import log_error
+from .perf import PERF_RECORDER
+from .utils import get_default_startupinfo, remove_suffix
+
+
+@dataclass
+class ProcessRecord:
+    """The record of a finished process."""
+
+    program: str
+    """The program name of the command, which is used to look up the timeout."""
+    command: str | Sequence[str]
+    """The executed command."""
+    duration: float
+    """The elapsed time in seconds."""
+    returncode: int | None
+    """The exit code of the process. `None` if it failed to start."""
+    timed_out: bool = False
+    """Whether the process has been killed due to timeout."""
+
+
+@dataclass(frozen=True)
+class ProcessOptions:
+    """Options from the settings of a session. Each session has its own options rather than sharing ones."""
+
+    DEFAULT_TIMEOUT: ClassVar[float] = 30.0
+    DEFAULT_MAX_CONCURRENCY: ClassVar[int] = 4
+
+    timeouts: Mapping[str, float] = field(default_factory=dict)
+    """The timeout in seconds per program name. The `*` key is the default."""
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    """The maximum number of processes which run at the same time with these options."""
+
+    @classmethod
+    def from_settings(cls, settings: DottedDict) -> ProcessOptions:
+        """Creates options from user settings."""
+        timeouts: dict[str, Any] = settings.get("subprocessTimeouts") or {}
+        return cls(
+            timeouts={
+                str(program).lower(): float(timeout)
+                for program, timeout in timeouts.items()
+                if isinstance(timeout, (int, float))
+            },
+            max_concurrency=max(1, settings.get("subprocessMaxConcurrency") or cls.DEFAULT_MAX_CONCURRENCY),
+        )
+
+    def get_timeout(self, program: str) -> float | None:
+        """Returns the timeout for the program. Zero or negative values mean no timeout."""
+        timeout = self.timeouts.get(program, self.timeouts.get("*", self.DEFAULT_TIMEOUT))
+        return timeout if timeout > 0 else None
+
+
+class ProcessRunner:
+    """
+    Runs external processes with a timeout and a limited concurrency, which are given by `ProcessOptions` per call.
+
+    When a process times out, its whole process group is killed so shell wrappers don't leave orphans behind.
+    """
+
+    def __init__(self) -> None:
+        self.records: deque[ProcessRecord] = deque(maxlen=200)
+        """The recently finished processes."""
+        self._semaphores: dict[int, threading.BoundedSemaphore] = {}
+        """The semaphore per `ProcessOptions.max_concurrency`."""
+        self._semaphores_lock = threading.Lock()
+
+    def get_semaphore(self, max_concurrency: int) -> threading.BoundedSemaphore:
+        """Returns the semaphore shared by calls with the same concurrency limit."""
+        with self._semaphores_lock:
+            if not (semaphore := self._semaphores.get(max_concurrency)):
+                semaphore = self._semaphores[max_concurrency] = threading.BoundedSemaphore(max_concurrency)
+            return semaphore
+
+    def run(
+        self,
+        command: str | Sequence[str],
+        *,
+        cwd: str | Path | None = None,
+        shell: bool = True,
+        timeout: float | None = None,
+        options: ProcessOptions | None = None,
+    ) -> tuple[str, str, int] | None:
+        """
+        Runs the command and returns `(stdout, stderr, exit_code)`.
+
+        If `timeout` is not given, it's looked up from `options`, which are the default ones if not given.
+        `None` is returned if the process fails to start or times out.
+        """
+        options = options or ProcessOptions()
+        program = self.get_program_name(command)
+        if timeout is None:
+            timeout = options.get_timeout(program)
+
+        with self.get_semaphore(options.max_concurrency), PERF_RECORDER.measure("process", program):
+            start_time = time.perf_counter()
+            record = ProcessRecord(program=program, command=command, duration=0, returncode=None)
+            try:
+                return self._run(command, cwd=cwd, shell=shell, timeout=timeout, record=record)
+            finally:
+                record.duration = time.perf_counter() - start_time
+                self.records.append(record)
+
+    def _run(
+        self,
+        command: str | Sequence[str],
+        *,
+        cwd: str | Path | None,
+        shell: bool,
+        timeout: float | None,
+        record: ProcessRecord,
+    ) -> tuple[str, str, int] | None:
+        try:
+            proc = subprocess.Popen(
+                command,
+                cwd=cwd,
+                shell=shell,
+                startupinfo=get_default_startupinfo(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                **self._process_group_kwargs(),
+            )
+        except Exception as e:
+            log_error(f"Failed running command ({command}): {e}")
+            return None
+
+        try:
+            stdout, stderr = map(str.rstrip, proc.communicate(timeout=timeout))
+        except subprocess.TimeoutExpired:
+            record.timed_out = True
+            self._kill_process_group(proc)
+            log_error(f"Killed command ({command}) because it didn't finish in {timeout} seconds.")
+            return None
+        except Exception as e:
+            self._kill_process_group(proc)
+            log_error(f"Failed running command ({command}): {e}")
+            return None
+
+        record.returncode = proc.returncode or 0
+        if stderr:
+            log_error(f"Failed running command ({command}): {stderr}")
+
+        return stdout, stderr, record.returncode
+
+    @staticmethod
+    def get_program_name(command: str | Sequence[str]) -> str:
+        """Gets the lowercase program name without extension. E.g., `"C:/bin/Poetry.EXE env info"` -> `"poetry"`."""
+        if isinstance(command, str):
+            command = command.split()
+        if not command:
+            return ""
+        name = Path(command[0]).name.lower()
+        for ext in (".exe", ".bat", ".cmd"):
+            name = remove_suffix(name, ext)
+        return name
+
+    @staticmethod
+    def _process_group_kwargs() -> dict[str, Any]:
+        if os.name == "nt":
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}  # type: ignore
+        return {"start_new_session": True}
+
+    @staticmethod
+    def _kill_process_group(proc: subprocess.Popen) -> None:
+        try:
+            if os.name == "nt":
+                subprocess.run(
+                    ("taskkill", "/F", "/T", "/PID", str(proc.pid)),
+                    startupinfo=get_default_startupinfo(),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+            else:
+                os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        try:
+            proc.kill()
+            proc.communicate(timeout=5)
+        except Exception:
+            pass
+
+
+PROCESS_RUNNER = ProcessRunner()
+"""The process runner shared by all finders and dev environment handlers."""
+
+
+def run_process(
+    command: str | Sequence[str],
+    *,
+    cwd: str | Path | None = None,
+    shell: bool = True,
+    timeout: float | None = None,
+    options: ProcessOptions | None = None,
+) -> tuple[str, str, int] | None:
+    """Runs the command with the shared process runner. See `ProcessRunner.run`."""
+    return PROCESS_RUNNER.run(command, cwd=cwd, shell=shell, timeout=timeout, options=options)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import sublime
+from sublime_lib import ResourcePath
+
+from .utils import file_signature
+
+
+@dataclass
+class SyncReport:
+    written: int = 0
+    """The number of files which have been written."""
+    skipped: int = 0
+    """The number of files which have been unchanged."""
+    elapsed: float = 0.0
+    """The elapsed time in seconds."""
+
+    def __str__(self) -> str:
+        return f"{self.written} written, {self.skipped} unchanged, took {self.elapsed:.3f}s"
+
+
+def sync_resource_tree(src: ResourcePath, dst: Path, *, manifest_path: Path, version: str = "") -> SyncReport:
+    """
+    Copies resources under `src` into `dst` like `ResourcePath.copytree` but only writes changed files.
+
+    The manifest records `version` (e.g., the version of the package which `dst` belongs to), and for every written
+    file, the signature of its source and the stat of it after written. If `version` matches the manifest's,
+    a file is skipped when its source is unchanged and the written file is untouched since then.
+    Otherwise, `dst` is considered as freshly installed and every file is written without being compared.
+    """
+    start_time = time.perf_counter()
+    report = SyncReport()
+    manifest = _load_manifest(manifest_path)
+    files: dict[str, Any] = manifest.get("files", {}) if manifest.get("version") == version else {}
+    new_files: dict[str, Any] = {}
+    try:
+        for resource in src.rglob("*"):
+            parts = resource.relative_to(src)
+            key = "/".join(parts)
+            target = dst.joinpath(*parts)
+            source = list(_resource_signature(resource) or ())
+
+            if (
+                source
+                and (entry := files.get(key))
+                and entry.get("source") == source
+                and (stat := file_signature(target))
+                and entry.get("stat") == list(stat)
+            ):
+                new_files[key] = entry
+                report.skipped += 1
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(resource.read_bytes())
+            new_files[key] = {"source": source, "stat": list(file_signature(target) or ())}
+            report.written += 1
+    finally:
+        # keep what has been done even if failed in the middle
+        files.update(new_files)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps({"version": version, "files": files}), encoding="utf-8")
+
+    report.elapsed = time.perf_counter() - start_time
+    return report
+
+
+def link_path(src: Path, dst: Path) -> bool:
+    """
+    Makes `dst` a symlink to `src`, replacing whatever is at `dst`.
+
+    Returns `False` if symlinks are not supported (e.g., Windows without the privilege). `dst` is untouched then.
+    """
+    if dst.is_symlink() and Path(os.readlink(dst)) == src:
+        return True
+
+    tmp_link = dst.with_name(f"{dst.name}.link.tmp")
+    if tmp_link.is_symlink():
+        tmp_link.unlink()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.symlink(src, tmp_link, target_is_directory=src.is_dir())
+    except OSError:
+        return False
+
+    if dst.is_symlink() or dst.is_file():
+        dst.unlink()
+    elif dst.is_dir():
+        shutil.rmtree(dst)
+    os.replace(tmp_link, dst)
+    return True
+
+
+def _load_manifest(manifest_path: Path) -> dict[str, Any]:
+    try:
+        manifest = json.loads(manifest_path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _resource_signature(resource: ResourcePath) -> tuple[int, int] | None:
+    """
+    Returns the signature of the file where the resource is loaded from without reading it.
+
+    For a packed package, it's the signature of the `.sublime-package` file, which changes whenever the package
+    is updated. `None` if neither is found.
+    """
+    try:
+        if signature := file_signature(resource.file_path()):
+            return signature
+    except ValueError:  # not under "Packages/"
+        return None
+    archive_path = Path(sublime.installed_packages_path(), f"{resource.package}.sublime-package")
+    return file_signature(archive_path)
@@ -0,0 +1,209 @@
+"""Finding the language server process and sampling its resource usage."""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .process_runner import ProcessOptions, run_process
+
+SERVER_TAG_ARG_PREFIX = "--lsp-pyright-tag="
+"""
+The prefix of an argument appended to the server command so that the process of a session can be found.
+The server ignores arguments it doesn't know.
+"""
+SERVER_TAG_SETTING = "serverProcessTag"
+"""The session setting which carries the tag from starting the server to the plugin instance of the session."""
+
+
+def template_uses_server_stats(template_text: str) -> bool:
+    """Whether the "statusText" template refers to `server.*` variables, which need the server to be sampled."""
+    return "server." in template_text
+
+
+def make_server_tag() -> str:
+    return os.urandom(8).hex()
+
+
+@dataclass
+class ProcessStats:
+    pid: int
+    """The process ID."""
+    rss: int
+    """The resident set size in bytes."""
+    cpu_time: float
+    """The CPU time (user + system) in seconds."""
+
+
+@dataclass(frozen=True)
+class ServerStats:
+    """Live stats of the server, which are provided as `server.*` variables of the "statusText" template."""
+
+    rss_mb: int | None = None
+    """The resident set size in MB. `None` if it's unknown."""
+    cpu_percent: float | None = None
+    """The CPU usage since the previous sampling, where 100 means a full core. `None` if it's unknown."""
+    pending_requests: int = 0
+    """The number of requests waiting for responses."""
+    hover_p95_ms: int | None = None
+    """The 95th percentile latency of recent hover requests in milliseconds. `None` if there is no response yet."""
+    completion_p95_ms: int | None = None
+    """The 95th percentile latency of recent completion requests in milliseconds. `None` if there is no response yet."""
+
+
+def find_process_by_tag(tag: str, *, options: ProcessOptions | None = None) -> int | None:
+    """Finds the ID of the process whose command line contains the server tag."""
+    needle = f"{SERVER_TAG_ARG_PREFIX}{tag}"
+    if sys.platform == "linux":
+        for proc_dir in Path("/proc").iterdir():
+            if not proc_dir.name.isdigit():
+                continue
+            try:
+                if needle.encode() in (proc_dir / "cmdline").read_bytes():
+                    return int(proc_dir.name)
+            except OSError:
+                continue
+        return None
+
+    if os.name == "nt":
+        command = [
+            "powershell",
+            "-NoProfile",
+            "-Command",
+            # `$PID` excludes this PowerShell process, whose command line contains the tag as well
+            f"(Get-CimInstance Win32_Process -Filter \"CommandLine like '%{needle}%' and ProcessId != $PID\")"
+            ".ProcessId",
+        ]
+    else:
+        command = ["ps", "-A", "-o", "pid=,args="]
+    if not (result := run_process(command, shell=False, options=options)):
+        return None
+    for line in result[0].splitlines():
+        pid, _, args = line.strip().partition(" ")
+        if pid.isdigit() and (os.name == "nt" or needle in args):
+            return int(pid)
+    return None
+
+
+def get_process_stats(pid: int, *, options: ProcessOptions | None = None) -> ProcessStats | None:
+    """Samples the resource usage of the process. `None` if the process has gone."""
+    if sys.platform == "linux":
+        try:
+            rss_pages = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+            # the process name may contain spaces and parentheses so fields are counted from the last ")"
+            stat_fields = Path(f"/proc/{pid}/stat").read_text().rpartition(")")[2].split()
+            cpu_ticks = int(stat_fields[11]) + int(stat_fields[12])  # utime + stime
+        except (OSError, IndexError, ValueError):
+            return None
+        return ProcessStats(
+            pid=pid,
+            rss=rss_pages * os.sysconf("SC_PAGE_SIZE"),
+            cpu_time=cpu_ticks / os.sysconf("SC_CLK_TCK"),
+        )
+
+    if os.name == "nt":
+        return get_process_stats_windows(pid)
+
+    if not (result := run_process(["ps", "-o", "rss=,time=", "-p", str(pid)], shell=False, options=options)):
+        return None
+    try:
+        rss, cpu_time = result[0].split()
+        return ProcessStats(pid=pid, rss=int(rss) * 1024, cpu_time=parse_ps_time(cpu_time))
+    except ValueError:
+        return None
+
+
+def get_process_stats_windows(pid: int) -> ProcessStats | None:
+    """Samples the process with Win32 APIs, which is much cheaper than spawning PowerShell."""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    PROCESS_VM_READ = 0x0010
+    STILL_ACTIVE = 259
+
+    kernel32 = ctypes.windll.kernel32  # type: ignore
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    psapi = ctypes.windll.psapi  # type: ignore
+    if not (handle := kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ, False, pid)):
+        return None
+    try:
+        exit_code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)) or exit_code.value != STILL_ACTIVE:
+            return None
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+        if not psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return None
+        creation_time, exit_time, kernel_time, user_time = (wintypes.FILETIME() for _ in range(4))
+        if not kernel32.GetProcessTimes(
+            handle,
+            ctypes.byref(creation_time),
+            ctypes.byref(exit_time),
+            ctypes.byref(kernel_time),
+            ctypes.byref(user_time),
+        ):
+            return None
+    finally:
+        kernel32.CloseHandle(handle)
+
+    def to_seconds(filetime: wintypes.FILETIME) -> float:
+        return ((filetime.dwHighDateTime << 32) + filetime.dwLowDateTime) / 10_000_000  # 100-nanosecond units
+
+    return ProcessStats(
+        pid=pid,
+        rss=counters.WorkingSetSize,
+        cpu_time=to_seconds(kernel_time) + to_seconds(user_time),
+    )
+
+
+def parse_ps_time(s: str) -> float:
+    """Parses the `time` column of `ps`, which is `[[dd-]hh:]mm:ss[.ss]`, into seconds."""
+    days, _, clock = s.rpartition("-")
+    seconds = 0.0
+    for part in clock.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds + int(days or 0) * 86400
+
+
+class ServerProcessMonitor:
+    """Samples the resource usage of the server process which has been started with the given tag."""
+
+    def __init__(self, tag: str) -> None:
+        self.tag = tag
+        self.pid: int | None = None
+        """The server process ID, which is found on the first successful sampling."""
+        self.cpu_percent: float | None = None
+        """The CPU usage between the last two samplings, where 100 means a full core."""
+        self._last_sample: tuple[float, float] | None = None
+        """`(monotonic time, CPU time)` of the last sampling."""
+
+    def sample(self, options: ProcessOptions | None = None) -> ProcessStats | None:
+        if not (self.pid and (stats := get_process_stats(self.pid, options=options))):
+            # the server may not have been started yet
+            self.pid = find_process_by_tag(self.tag, options=options)
+            self._last_sample = None
+            if not self.pid or not (stats := get_process_stats(self.pid, options=options)):
+                return None
+        now = time.monotonic()
+        if self._last_sample and (elapsed := now - self._last_sample[0]) > 0:
+            self.cpu_percent = max(0.0, stats.cpu_time - self._last_sample[1]) / elapsed * 100
+        self._last_sample = (now, stats.cpu_time)
+        return stats
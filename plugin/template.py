@@ -1,23 +1,32 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
-import jinja2
 import sublime
 
 from .constants import PACKAGE_NAME
 
-JINJA_TEMPLATE_ENV = jinja2.Environment(
-    extensions=[
-        "jinja2.ext.do",
-        "jinja2.ext.loopcontrols",
-    ],
-)
+if TYPE_CHECKING:
+    import jinja2
+
+
+@lru_cache(maxsize=1)
+def get_jinja_template_env() -> jinja2.Environment:
+    """The Jinja environment, which is created on the first use since importing `jinja2` slows down plugin loading."""
+    import jinja2
+
+    return jinja2.Environment(
+        extensions=[
+            "jinja2.ext.do",
+            "jinja2.ext.loopcontrols",
+        ],
+    )
 
 
 @lru_cache
 def load_string_template(template: str) -> jinja2.Template:
-    return JINJA_TEMPLATE_ENV.from_string(template)
+    return get_jinja_template_env().from_string(template)
 
 
 @lru_cache
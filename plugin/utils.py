@@ -5,13 +5,12 @@ import os
 import re
 import subprocess
 import sys
-from collections.abc import Generator, Iterable
+from collections.abc import Collection, Generator, Iterable
 from pathlib import Path
-from typing import Any, Sequence, TypeVar
-
-from .log import log_error
+from typing import Any, Callable, Hashable, TypeVar, overload
 
 _T = TypeVar("_T")
+_U = TypeVar("_U")
 
 
 def camel_to_snake(s: str) -> str:
@@ -47,6 +46,28 @@ def drop_falsy(iterable: Iterable[_T | None]) -> Generator[_T, None, None]:
     yield from filter(None, iterable)
 
 
+@overload
+def first_true(iterable: Iterable[_T], *, pred: Callable[[_T], Any] | None = None) -> _T | None: ...
+@overload
+def first_true(iterable: Iterable[_T], default: _U, pred: Callable[[_T], Any] | None = None) -> _T | _U: ...
+def first_true(iterable: Iterable[Any], default: Any = None, pred: Callable[[Any], Any] | None = None) -> Any:
+    """Returns the first value which is truthy (or `pred` returns truthy for). I.e., `more_itertools.first_true`."""
+    return next(filter(pred, iterable), default)
+
+
+def unique_everseen(
+    iterable: Iterable[_T],
+    *,
+    key: Callable[[_T], Hashable] | None = None,
+) -> Generator[_T, None, None]:
+    """Yields unique values in the order of appearance. I.e., `more_itertools.unique_everseen` for hashable values."""
+    seen: set[Hashable] = set()
+    for value in iterable:
+        if (marker := value if key is None else key(value)) not in seen:
+            seen.add(marker)
+            yield value
+
+
 def iterate_lines(s: str, *, keepends: bool = False) -> Generator[str, None, None]:
     """Iterates over lines of the string."""
     with io.StringIO(s) as f:
@@ -73,28 +94,36 @@ def resolved_posix_path(path: str | Path) -> str | None:
         return None
 
 
-def run_shell_command(
-    command: str | Sequence[str],
-    *,
-    cwd: str | Path | None = None,
-    shell: bool = True,
-) -> tuple[str, str, int] | None:
+def file_signature(path: str | Path) -> tuple[int, int] | None:
+    """Returns `(mtime_ns, size)` of the file, which changes whenever the file is modified. `None` if it's missing."""
     try:
-        proc = subprocess.Popen(
-            command,
-            cwd=cwd,
-            shell=shell,
-            startupinfo=get_default_startupinfo(),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-        )
-        stdout, stderr = map(str.rstrip, proc.communicate())
-    except Exception as e:
-        log_error(f"Failed running command ({command}): {e}")
+        stat = os.stat(path)
+    except OSError:
         return None
+    return (stat.st_mtime_ns, stat.st_size)
 
-    if stderr:
-        log_error(f"Failed running command ({command}): {stderr}")
 
-    return stdout, stderr, proc.returncode or 0
+def scan_subdirectories(
+    path: str | Path,
+    *,
+    ignores: Collection[str] = (),
+    max_entries: int = 0,
+) -> Generator[os.DirEntry[str], None, None]:
+    """
+    Yields subdirectories of `path` with a single `os.scandir` pass.
+
+    Entries whose names are in `ignores` are skipped. If `max_entries` is positive,
+    at most that many entries (files included) are scanned so a huge directory can't take forever.
+    """
+    with os.scandir(path) as it:
+        for index, entry in enumerate(it):
+            if 0 < max_entries <= index:
+                return
+            if entry.name in ignores:
+                continue
+            try:
+                # this doesn't need a `stat` call on most platforms unless the entry is a symlink
+                if entry.is_dir():
+                    yield entry
+            except OSError:
+                continue
@@ -3,12 +3,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 import sublime
-from LSP.plugin import parse_uri
+from LSP.plugin import Notification, Session, parse_uri
 
+from .auto_exclude import AutoExcludeResult
 from .utils import drop_falsy, resolved_posix_path
 from .virtual_env.venv_info import BaseVenvInfo
 
@@ -17,15 +19,53 @@ from .virtual_env.venv_info import BaseVenvInfo
 class WorkspaceFolderAttr:
     venv_info: BaseVenvInfo | None = None
     """The information of the virtual environment."""
+    auto_exclude: AutoExcludeResult | None = None
+    """The result of scanning for `autoExclude`, which is done only once."""
+
+
+class WorkspaceFolderIndex:
+    """A prefix tree of resolved workspace folders, which finds the deepest folder containing a path."""
+
+    def __init__(self, folders: Iterable[str]) -> None:
+        self.folders = tuple(folders)
+        """The unresolved folders this index is built from."""
+        self._root: dict[str | None, Any] = {}
+        for folder in drop_falsy(map(resolved_posix_path, self.folders)):
+            node = self._root
+            for part in folder.rstrip("/").split("/"):
+                node = node.setdefault(part, {})
+            # the `None` key never collides with a path part and marks the end of a folder
+            node[None] = Path(folder)
+
+    def find(self, path: str | Path) -> Path | None:
+        """Find a workspace folder for the path. The deepest folder wins if there are multiple matches."""
+        if not (path_ := resolved_posix_path(path)):
+            return None
+        node = self._root
+        found: Path | None = None
+        for part in path_.rstrip("/").split("/"):
+            if (child := node.get(part)) is None:
+                break
+            node = child
+            found = node.get(None, found)
+        return found
+
+
+_workspace_folder_indexes: dict[int, WorkspaceFolderIndex] = {}
+"""Workspace folder indexes per window ID."""
 
 
 def find_workspace_folder(window: sublime.Window, path: str | Path) -> Path | None:
     """Find a workspace folder for the path. The deepest folder wins if there are multiple matches."""
-    if path_ := resolved_posix_path(path):
-        for folder in sorted(drop_falsy(map(resolved_posix_path, window.folders())), key=len, reverse=True):
-            if f"{path_}/".startswith(f"{folder}/"):
-                return Path(folder)
-    return None
+    folders = window.folders()
+    if (index := _workspace_folder_indexes.get(window.id())) is None or index.folders != tuple(folders):
+        index = _workspace_folder_indexes[window.id()] = WorkspaceFolderIndex(folders)
+    return index.find(path)
+
+
+def send_did_change_configuration(session: Session) -> None:
+    """Notifies the server that the configuration has changed so it will request configurations again."""
+    session.send_notification(Notification("workspace/didChangeConfiguration", {"settings": None}))
 
 
 def lowercase_drive_letter(path: str) -> str:
@@ -43,7 +83,7 @@ def uri_to_file_path(uri: str) -> str | None:
 
 class ConfigurationSection:
     def __init__(self, section: str | None) -> None:
-        self.parts = section.split(".") if section else []
+        self.parts: tuple[str, ...] = tuple(section.split(".")) if section else ()
 
     def __contains__(self, other_section: ConfigurationSection) -> bool:
         return other_section.parts[: len(self.parts)] == self.parts
@@ -52,6 +92,12 @@ class ConfigurationSection:
         return f"ConfigurationSection({'.'.join(self.parts)})"
 
 
+@lru_cache(maxsize=256)
+def parse_configuration_section(section: str | None) -> ConfigurationSection:
+    """Same as `ConfigurationSection(section)` but parsed sections are reused. Don't modify the returned one."""
+    return ConfigurationSection(section)
+
+
 class ConfigurationProxy:
     """
     Holds full or part of the configuration and exposes access through absolute keys to that slice of configuration.
@@ -68,11 +114,8 @@ class ConfigurationProxy:
         self.section = section
 
     def get(self, key: str) -> Any:
-        target_section = ConfigurationSection(key)
-        if target_section not in self.section:
+        if (relative_parts := self._relative_parts(key)) is None:
             return None
-        # Path relative to the object we actually hold.
-        relative_parts = target_section.parts[len(self.section.parts) :]
         if not relative_parts:
             return self.configuration
         node: Any = self.configuration
@@ -86,13 +129,8 @@ class ConfigurationProxy:
         return node[last]
 
     def set(self, key: str, value: Any) -> None:
-        target_section = ConfigurationSection(key)
-        if target_section not in self.section:
-            return
-        # Path relative to the object we actually hold.
-        relative_parts = target_section.parts[len(self.section.parts) :]
-        if not relative_parts:
-            return  # target == the section itself; can't set the root
+        if not (relative_parts := self._relative_parts(key)):
+            return  # not contained or target == the section itself; can't set the root
         # Walk to the parent, creating missing intermediate dicts along the way.
         node: Any = self.configuration
         for part in relative_parts[:-1]:
@@ -103,3 +141,19 @@ class ConfigurationProxy:
         if not isinstance(node, dict):
             return
         node[last] = value
+
+    def pop(self, key: str) -> Any:
+        """Removes the key and returns its value. `None` if it doesn't exist."""
+        if not (relative_parts := self._relative_parts(key)):
+            return None
+        parent = self.get(".".join(self.section.parts + relative_parts[:-1]))
+        if not isinstance(parent, dict):
+            return None
+        return parent.pop(relative_parts[-1], None)
+
+    def _relative_parts(self, key: str) -> tuple[str, ...] | None:
+        """The parts of `key` relative to the object we actually hold. `None` if it's not in our section."""
+        target_section = parse_configuration_section(key)
+        if target_section not in self.section:
+            return None
+        return target_section.parts[len(self.section.parts) :]
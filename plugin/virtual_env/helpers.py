@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Sequence
 
 from LSP.plugin import Session
-from more_itertools import first_true
 
-from .venv_finder import find_finder_class_by_name
+from ..utils import drop_falsy, first_true
+from .venv_cache import VenvCache
+from .venv_finder import BaseVenvFinder, find_finder_class_by_name
 from .venv_info import BaseVenvInfo, list_venv_info_classes
 
 
@@ -15,21 +19,110 @@ def find_venv_by_finder_names(
     *,
     session: Session,
     project_dir: Path | None = None,
+    cache: VenvCache | None = None,
+    concurrent: bool = False,
 ) -> BaseVenvInfo | None:
-    """Finds the virtual environment information by finders."""
+    """
+    Finds the virtual environment information by finders.
+
+    If `cache` is given, the result of each finder is reused as long as nothing that finder depends on has changed.
+    If `concurrent` is `True`, finders are run at the same time but the result still respects their order.
+    """
     if isinstance(finder_names, str):
         finder_names = (finder_names,)
 
-    for finder_name in finder_names:
-        if (
-            (finder_cls := find_finder_class_by_name(finder_name))
-            and finder_cls.can_support(project_dir=project_dir, session=session)
-            and (venv_info := finder_cls(project_dir=project_dir, session=session).find_venv())
-        ):
+    finder_classes = tuple(drop_falsy(map(find_finder_class_by_name, finder_names)))
+    find_venv = _find_venv_concurrently if concurrent and len(finder_classes) > 1 else _find_venv_sequentially
+    return find_venv(finder_classes, session=session, project_dir=project_dir, cache=cache)
+
+
+def calculate_finders_signature(
+    finder_names: Sequence[str],
+    *,
+    session: Session,
+    project_dir: Path | None = None,
+) -> str:
+    """Calculates the signature of everything the given finders depend on."""
+    signature = [
+        calculate_finder_signature(finder_cls, session=session, project_dir=project_dir)
+        for finder_name in finder_names
+        if (finder_cls := find_finder_class_by_name(finder_name))
+    ]
+    return hashlib.sha1(json.dumps(signature).encode("utf-8")).hexdigest()
+
+
+def calculate_finder_signature(
+    finder_cls: type[BaseVenvFinder],
+    *,
+    session: Session,
+    project_dir: Path | None = None,
+) -> str:
+    """Calculates the signature of everything the finder depends on."""
+    signature = finder_cls.calculate_signature(project_dir=project_dir, session=session)
+    return hashlib.sha1(json.dumps(signature).encode("utf-8")).hexdigest()
+
+
+def _probe_finder(
+    finder_cls: type[BaseVenvFinder],
+    *,
+    session: Session,
+    project_dir: Path | None,
+    cache: VenvCache | None = None,
+) -> BaseVenvInfo | None:
+    if not finder_cls.can_support(project_dir=project_dir, session=session):
+        return None
+    if not (cache and project_dir):
+        return finder_cls(project_dir=project_dir, session=session).find_venv()
+
+    signature = calculate_finder_signature(finder_cls, session=session, project_dir=project_dir)
+    is_hit, venv_info = cache.get(project_dir, finder_cls.name(), signature)
+    if not is_hit:
+        venv_info = finder_cls(project_dir=project_dir, session=session).find_venv()
+        # A CLI may find a venv which none of the markers cover later (e.g., a poetry env created outside the project)
+        # so "no venv" from a CLI-based finder is never persisted.
+        if venv_info or not finder_cls.marker_executables:
+            cache.set(project_dir, finder_cls.name(), signature, venv_info)
+    return venv_info
+
+
+def _find_venv_sequentially(
+    finder_classes: Sequence[type[BaseVenvFinder]],
+    *,
+    session: Session,
+    project_dir: Path | None,
+    cache: VenvCache | None = None,
+) -> BaseVenvInfo | None:
+    for finder_cls in finder_classes:
+        if venv_info := _probe_finder(finder_cls, session=session, project_dir=project_dir, cache=cache):
             return venv_info
     return None
 
 
+def _find_venv_concurrently(
+    finder_classes: Sequence[type[BaseVenvFinder]],
+    *,
+    session: Session,
+    project_dir: Path | None,
+    cache: VenvCache | None = None,
+) -> BaseVenvInfo | None:
+    executor = ThreadPoolExecutor(max_workers=len(finder_classes), thread_name_prefix="venv-finder")
+    futures = [
+        executor.submit(_probe_finder, finder_cls, session=session, project_dir=project_dir, cache=cache)
+        for finder_cls in finder_classes
+    ]
+    try:
+        # wait in the priority order so a lower-priority result never wins over a higher-priority one
+        for future in futures:
+            if venv_info := future.result():
+                return venv_info
+        return None
+    finally:
+        # lower-priority finders which haven't started are cancelled and running ones are just ignored
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
 def find_venv_by_python_executable(python_executable: str | Path) -> BaseVenvInfo | None:
     """Finds the virtual environment information by the Python executable path."""
     return first_true(
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any
+
+from ..cache import get_json_file_cache
+from ..utils import file_signature
+from .venv_info import BaseVenvInfo, list_venv_info_classes
+
+
+class VenvCache:
+    """
+    Persists the result of each venv finder per project directory.
+
+    An entry is only reused if the signature of its finder is unchanged
+    and the marker of the found virtual environment itself (`pyvenv.cfg`, `conda-meta`) is not modified.
+    Since each finder has its own signature, a change which only one finder depends on doesn't invalidate the others.
+    Callers decide which results are worth persisting. E.g., "no venv" from CLI-based finders is not.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._cache = get_json_file_cache(path, version=2)
+        self._set_lock = threading.Lock()
+        """Finders may store their results concurrently and entries of a project directory are read-modify-written."""
+
+    def get(self, project_dir: Path, finder_name: str, signature: str) -> tuple[bool, BaseVenvInfo | None]:
+        """Returns `(is_hit, venv_info)`. Note that a hit can be `None`, i.e., the finder has found no venv before."""
+        entries = self._cache.get(str(project_dir))
+        entry = entries.get(finder_name) if isinstance(entries, dict) else None
+        if not isinstance(entry, dict) or entry.get("signature") != signature:
+            return (False, None)
+        if (venv := entry.get("venv")) is None:
+            return (True, None)
+        if (venv_info := self.deserialize_venv_info(venv)) and venv.get("marker") == self.marker_signature(venv_info):
+            return (True, venv_info)
+        return (False, None)
+
+    def set(self, project_dir: Path, finder_name: str, signature: str, venv_info: BaseVenvInfo | None) -> None:
+        with self._set_lock:
+            entries = self._cache.get(str(project_dir))
+            self._cache.set(
+                str(project_dir),
+                {
+                    **(entries if isinstance(entries, dict) else {}),
+                    finder_name: {
+                        "signature": signature,
+                        "venv": self.serialize_venv_info(venv_info) if venv_info else None,
+                    },
+                },
+            )
+
+    def invalidate(self, project_dir: Path) -> None:
+        self._cache.pop(str(project_dir))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @classmethod
+    def serialize_venv_info(cls, venv_info: BaseVenvInfo) -> dict[str, Any]:
+        return {
+            "class": type(venv_info).__name__,
+            "venv_dir": str(venv_info.venv_dir),
+            "prompt": venv_info.prompt,
+            "python_version": venv_info.python_version,
+            "finder_name": venv_info.meta.finder_name,
+            "marker": cls.marker_signature(venv_info),
+        }
+
+    @staticmethod
+    def deserialize_venv_info(data: dict[str, Any]) -> BaseVenvInfo | None:
+        for venv_info_cls in list_venv_info_classes():
+            if venv_info_cls.__name__ == data.get("class"):
+                venv_info = venv_info_cls(
+                    venv_dir=Path(data["venv_dir"]),
+                    prompt=data.get("prompt", ""),
+                    python_version=data.get("python_version", ""),
+                )
+                venv_info.meta.finder_name = data.get("finder_name", "")
+                return venv_info
+        return None
+
+    @staticmethod
+    def marker_signature(venv_info: BaseVenvInfo) -> list[int] | None:
+        if signature := file_signature(venv_info.marker_path):
+            return list(signature)
+        return None
@@ -2,20 +2,38 @@ from __future__ import annotations
 
 import os
 import shutil
+import time
 from abc import ABC, abstractmethod
 from functools import lru_cache
-from itertools import product
 from pathlib import Path
 from types import MappingProxyType
-from typing import Generator, Mapping, final
+from typing import Any, Generator, Mapping, final
 
 from LSP.plugin import Session
-from more_itertools import first_true
 
-from ..utils import camel_to_snake, iterate_lines, remove_suffix, run_shell_command
+from ..perf import PERF_RECORDER
+from ..process_runner import ProcessOptions, run_process
+from ..utils import (
+    camel_to_snake,
+    file_signature,
+    first_true,
+    iterate_lines,
+    remove_suffix,
+    scan_subdirectories,
+)
 from .venv_info import BaseVenvInfo, CondaVenvInfo, Pep405VenvInfo, list_venv_info_classes
 
 
+@lru_cache
+def which_in_path(executable: str, path: str | None) -> str | None:
+    """
+    `shutil.which` memoized per `PATH` since it checks every directory in `PATH`.
+
+    An executable installed into a directory which is already in `PATH` is noticed once the plugin is reloaded.
+    """
+    return shutil.which(executable, path=path)
+
+
 @lru_cache
 def find_finder_class_by_name(name: str) -> type[BaseVenvFinder] | None:
     """Finds the virtual environment finder class by its name."""
@@ -48,11 +66,20 @@ def list_venv_finder_classes() -> Generator[type[BaseVenvFinder], None, None]:
 
 
 class BaseVenvFinder(ABC):
+    marker_files: tuple[str, ...] = ()
+    """Files, relative to the project directory, whose modification may change the found virtual environment."""
+    marker_env_vars: tuple[str, ...] = ()
+    """Environment variables whose modification may change the found virtual environment."""
+    marker_executables: tuple[str, ...] = ()
+    """Executables whose (un)installation may change the found virtual environment."""
+
     def __init__(self, *, project_dir: Path | None, session: Session) -> None:
         self.project_dir = project_dir
         """The project root directory."""
         self.session = session
         """The LSP client session."""
+        self.process_options = ProcessOptions.from_settings(session.config.settings)
+        """The options of external commands, which are from the settings of the session."""
 
     @final
     @classmethod
@@ -64,12 +91,27 @@ class BaseVenvFinder(ABC):
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         """Check if this class support the given `project_dir`."""
 
+    @classmethod
+    def calculate_signature(cls, *, project_dir: Path | None, session: Session) -> list[Any]:
+        """
+        Calculates a JSON-serializable signature of everything this finder depends on.
+
+        If the signature doesn't change, the found virtual environment is assumed to be the same.
+        """
+        signature: list[Any] = [cls.name()]
+        signature.extend(os.environ.get(env_var) for env_var in cls.marker_env_vars)
+        signature.extend(which_in_path(executable, os.environ.get("PATH")) for executable in cls.marker_executables)
+        if project_dir:
+            signature.extend(file_signature(project_dir / marker_file) for marker_file in cls.marker_files)
+        return signature
+
     @final
     def find_venv(self) -> BaseVenvInfo | None:
         """Find the virtual environment."""
         try:
-            if not (venv_info := self.find_venv_()):
-                return None
+            with PERF_RECORDER.measure("venv_finder", self.name()):
+                if not (venv_info := self.find_venv_()):
+                    return None
         except PermissionError:
             return None
 
@@ -84,14 +126,91 @@ class BaseVenvFinder(ABC):
 class AnySubdirectoryVenvFinder(BaseVenvFinder):
     """Finds the virtual environment with any subdirectory."""
 
+    MARKER_PATHS_SETTLE_TIME = 60.0
+    """Seconds after the project directory is modified, during which its subdirectories are scanned on every call."""
+
+    marker_paths_caches: dict[tuple[Path, tuple[Any, ...]], tuple[int, tuple[str, ...]]] = {}
+    """
+    `(project_dir, settings)` => `(mtime_ns of project_dir, marker paths)` for `calculate_signature`,
+    which is called by every poll of the venv watcher, so subdirectories are only scanned again once a venv
+    directory may have been added or removed.
+    """
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         return bool(project_dir)
 
+    @classmethod
+    def calculate_signature(cls, *, project_dir: Path | None, session: Session) -> list[Any]:
+        """
+        Besides settings, only markers (`pyvenv.cfg`, `conda-meta`) in subdirectories and their interpreters are
+        part of the signature so that adding or removing an unrelated file in the project directory doesn't change it.
+        """
+        signature = [
+            *super().calculate_signature(project_dir=project_dir, session=session),
+            session.config.settings.get("anySubdirectoryIgnores"),
+            session.config.settings.get("anySubdirectoryMaxEntries"),
+        ]
+        if project_dir:
+            venv_info_classes = {venv_info_cls.marker_name: venv_info_cls for venv_info_cls in list_venv_info_classes()}
+            for marker_path in cls.find_marker_paths_cached(project_dir, session):
+                venv_dir, marker_name = os.path.split(marker_path)
+                # the marker may be written before the interpreter, which is needed for a valid venv
+                python_executable = venv_info_classes[marker_name](venv_dir=Path(venv_dir)).python_executable
+                signature.append((marker_path, file_signature(marker_path), file_signature(python_executable)))
+        return signature
+
+    @classmethod
+    def find_marker_paths_cached(cls, project_dir: Path, session: Session) -> tuple[str, ...]:
+        """
+        Like `find_marker_paths` but reuses the previous result if the project directory hasn't been modified.
+
+        A venv directory is created before its marker is, which doesn't modify the project directory again,
+        so the result isn't reused until the project directory has been left untouched for a while.
+        """
+        settings = session.config.settings
+        key = (
+            project_dir,
+            (tuple(settings.get("anySubdirectoryIgnores") or ()), settings.get("anySubdirectoryMaxEntries")),
+        )
+        try:
+            mtime_ns = os.stat(project_dir).st_mtime_ns
+        except OSError:
+            return ()
+        if (
+            (cached := cls.marker_paths_caches.get(key))
+            and cached[0] == mtime_ns
+            and time.time() - mtime_ns / 1e9 >= cls.MARKER_PATHS_SETTLE_TIME
+        ):
+            return cached[1]
+        marker_paths = tuple(cls.find_marker_paths(project_dir, session))
+        cls.marker_paths_caches[key] = (mtime_ns, marker_paths)
+        return marker_paths
+
+    @classmethod
+    def find_marker_paths(cls, project_dir: Path, session: Session) -> Generator[str, None, None]:
+        """Yields paths of venv markers in subdirectories of the project directory in the scanning order."""
+        settings = session.config.settings
+        marker_names = tuple(venv_info_cls.marker_name for venv_info_cls in list_venv_info_classes())
+        try:
+            for entry in scan_subdirectories(
+                project_dir,
+                ignores=frozenset(settings.get("anySubdirectoryIgnores") or ()),
+                max_entries=settings.get("anySubdirectoryMaxEntries") or 0,
+            ):
+                for marker_name in marker_names:
+                    if os.path.exists(marker_path := os.path.join(entry.path, marker_name)):
+                        yield marker_path
+        except OSError:
+            return
+
     def find_venv_(self) -> BaseVenvInfo | None:
         assert self.project_dir
-        for subproject_dir, venv_info_cls in product(self.project_dir.iterdir(), list_venv_info_classes()):
-            if venv_info := venv_info_cls.from_venv_dir(subproject_dir):
+        venv_info_classes = {venv_info_cls.marker_name: venv_info_cls for venv_info_cls in list_venv_info_classes()}
+        for marker_path in self.find_marker_paths(self.project_dir, self.session):
+            venv_dir, marker_name = os.path.split(marker_path)
+            venv_info_cls = venv_info_classes[marker_name]
+            if venv_info := venv_info_cls.from_venv_dir(venv_dir, process_options=self.process_options):
                 return venv_info
         return None
 
@@ -103,12 +222,14 @@ class EnvVarCondaPrefixVenvFinder(BaseVenvFinder):
     @see https://github.com/conda/conda
     """
 
+    marker_env_vars = ("CONDA_PREFIX",)
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         return "CONDA_PREFIX" in os.environ
 
     def find_venv_(self) -> CondaVenvInfo | None:
-        return CondaVenvInfo.from_venv_dir(os.environ["CONDA_PREFIX"])
+        return CondaVenvInfo.from_venv_dir(os.environ["CONDA_PREFIX"], process_options=self.process_options)
 
 
 class EnvVarVirtualEnvVenvFinder(BaseVenvFinder):
@@ -118,6 +239,8 @@ class EnvVarVirtualEnvVenvFinder(BaseVenvFinder):
     @see https://docs.python.org/library/venv.html
     """
 
+    marker_env_vars = ("VIRTUAL_ENV",)
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         return "VIRTUAL_ENV" in os.environ
@@ -138,6 +261,12 @@ class StProjectDataVenvFinder(BaseVenvFinder):
         project_data = session.window.project_data()
         return isinstance(project_data, dict)
 
+    @classmethod
+    def calculate_signature(cls, *, project_dir: Path | None, session: Session) -> list[Any]:
+        project_data = session.window.project_data()
+        venv_dir = project_data.get("virtualenv") if isinstance(project_data, dict) else None
+        return [*super().calculate_signature(project_dir=project_dir, session=session), venv_dir]
+
     def find_venv_(self) -> Pep405VenvInfo | None:
         project_data = self.session.window.project_data()
         assert isinstance(project_data, dict)
@@ -157,6 +286,13 @@ class LocalDotVenvVenvFinder(BaseVenvFinder):
     @see https://docs.python.org/library/venv.html
     """
 
+    # `venv` writes `pyvenv.cfg` before the interpreter so "no venv" found in between must not be kept
+    marker_files = tuple(
+        f"{venv_dir}/{marker}"
+        for venv_dir in (".venv", "venv")
+        for marker in ("pyvenv.cfg", "Scripts/python.exe" if os.name == "nt" else "bin/python")
+    )
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         return bool(project_dir)
@@ -178,6 +314,9 @@ class HatchVenvFinder(BaseVenvFinder):
     @see https://github.com/pypa/hatch
     """
 
+    marker_files = ("pyproject.toml", "hatch.toml")
+    marker_executables = ("hatch",)
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         return project_dir is not None and shutil.which("hatch") is not None
@@ -185,7 +324,7 @@ class HatchVenvFinder(BaseVenvFinder):
     def find_venv_(self) -> Pep405VenvInfo | None:
         # "hatch env find" will always provide a calculated path, where the hatch-managed venv should be at
         assert self.project_dir
-        if not (output := run_shell_command("hatch env find", cwd=self.project_dir)):
+        if not (output := run_process("hatch env find", cwd=self.project_dir, options=self.process_options)):
             return None
         venv_dir, _, exit_code = output
 
@@ -203,6 +342,9 @@ class PdmVenvFinder(BaseVenvFinder):
     @see https://github.com/pdm-project/pdm
     """
 
+    marker_files = (".pdm-python", "pyproject.toml")
+    marker_executables = ("pdm",)
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         try:
@@ -216,7 +358,7 @@ class PdmVenvFinder(BaseVenvFinder):
 
     def find_venv_(self) -> Pep405VenvInfo | None:
         assert self.project_dir
-        if not (output := run_shell_command("pdm info --python", cwd=self.project_dir)):
+        if not (output := run_process("pdm info --python", cwd=self.project_dir, options=self.process_options)):
             return None
         python_executable, _, _ = output
 
@@ -232,6 +374,9 @@ class PipenvVenvFinder(BaseVenvFinder):
     @see https://github.com/python-poetry/poetry
     """
 
+    marker_files = ("Pipfile", "Pipfile.lock")
+    marker_executables = ("pipenv",)
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         try:
@@ -245,7 +390,7 @@ class PipenvVenvFinder(BaseVenvFinder):
 
     def find_venv_(self) -> Pep405VenvInfo | None:
         assert self.project_dir
-        if not (output := run_shell_command("pipenv --py", cwd=self.project_dir)):
+        if not (output := run_process("pipenv --py", cwd=self.project_dir, options=self.process_options)):
             return None
         python_executable, _, _ = output
 
@@ -257,6 +402,9 @@ class PipenvVenvFinder(BaseVenvFinder):
 class PoetryVenvFinder(BaseVenvFinder):
     """Finds the virtual environment using `poetry`."""
 
+    marker_files = ("poetry.lock", "poetry.toml", "pyproject.toml")
+    marker_executables = ("poetry",)
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         try:
@@ -270,7 +418,7 @@ class PoetryVenvFinder(BaseVenvFinder):
 
     def find_venv_(self) -> Pep405VenvInfo | None:
         assert self.project_dir
-        if not (output := run_shell_command("poetry env info -p", cwd=self.project_dir)):
+        if not (output := run_process("poetry env info -p", cwd=self.project_dir, options=self.process_options)):
             return None
         venv_dir, _, _ = output
 
@@ -286,6 +434,9 @@ class PyenvVenvFinder(BaseVenvFinder):
     @see https://github.com/pyenv/pyenv
     """
 
+    marker_files = (".python-version",)
+    marker_executables = ("pyenv",)
+
     result_caches: dict[int, Pep405VenvInfo | None] = {}
     """
     It's expensive to keep invoking `pyenv which python` for equivalent `.python-version` contents.
@@ -305,7 +456,7 @@ class PyenvVenvFinder(BaseVenvFinder):
 
     def find_venv_(self) -> Pep405VenvInfo | None:
         def _work() -> Pep405VenvInfo | None:
-            if not (output := run_shell_command("pyenv which python", cwd=self.project_dir)):
+            if not (output := run_process("pyenv which python", cwd=self.project_dir, options=self.process_options)):
                 return None
             python_executable, _, _ = output
 
@@ -335,6 +486,9 @@ class RyeVenvFinder(BaseVenvFinder):
     @see https://github.com/astral-sh/rye
     """
 
+    marker_files = ("pyproject.toml", ".python-version")
+    marker_executables = ("rye",)
+
     @classmethod
     def can_support(cls, *, project_dir: Path | None, session: Session) -> bool:
         try:
@@ -348,7 +502,7 @@ class RyeVenvFinder(BaseVenvFinder):
 
     def find_venv_(self) -> Pep405VenvInfo | None:
         assert self.project_dir
-        if not (output := run_shell_command("rye show", cwd=self.project_dir)):
+        if not (output := run_process("rye show", cwd=self.project_dir, options=self.process_options)):
             return None
         stdout, _, _ = output
 
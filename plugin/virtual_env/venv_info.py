@@ -3,14 +3,16 @@ from __future__ import annotations
 import configparser
 import json
 import os
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Generator, TypedDict, final
+from typing import Any, ClassVar, Generator, TypedDict, final
 
 from typing_extensions import Self
 
-from ..utils import run_shell_command
+from ..process_runner import ProcessOptions, run_process
+from ..utils import resolved_posix_path
 
 
 def list_venv_info_classes() -> Generator[type[BaseVenvInfo], None, None]:
@@ -33,6 +35,9 @@ class VenvInfoMeta:
 class BaseVenvInfo(ABC):
     """The information of the virtual environment."""
 
+    marker_name: ClassVar[str] = ""
+    """The name of the file or directory, directly under the venv directory, which marks the virtual environment."""
+
     venv_dir: Path
     """The path of the virtual environment directory."""
 
@@ -73,13 +78,18 @@ class BaseVenvInfo(ABC):
             return self.bin_dir / "python.exe"
         return self.bin_dir / "python"
 
+    @property
+    @abstractmethod
+    def marker_path(self) -> Path:
+        """The path of the file or directory which marks the virtual environment."""
+
     @abstractmethod
     def is_valid(self) -> bool:
         """Checks if this virtual environment is valid."""
 
     @abstractmethod
-    def refresh_derived_attributes(self) -> None:
-        """Refreshes the derived attributes."""
+    def refresh_derived_attributes(self, *, process_options: ProcessOptions | None = None) -> None:
+        """Refreshes the derived attributes. `process_options` are used if external commands are invoked."""
 
     @classmethod
     def from_python_executable(cls, python_executable: str | Path) -> Self | None:
@@ -92,7 +102,7 @@ class BaseVenvInfo(ABC):
 
     @final
     @classmethod
-    def from_venv_dir(cls, venv_dir: str | Path) -> Self | None:
+    def from_venv_dir(cls, venv_dir: str | Path, *, process_options: ProcessOptions | None = None) -> Self | None:
         """Create an instance from the virtual environment directory."""
         try:
             venv_dir = Path(venv_dir).expanduser().resolve()
@@ -102,7 +112,7 @@ class BaseVenvInfo(ABC):
         if not (venv_info := cls(venv_dir=venv_dir)).is_valid():
             return None
 
-        venv_info.refresh_derived_attributes()
+        venv_info.refresh_derived_attributes(process_options=process_options)
         return venv_info
 
 
@@ -143,10 +153,25 @@ class CondaInfoDict(TypedDict):
 class CondaVenvInfo(BaseVenvInfo):
     """Venv information for Conda virtual environment."""
 
+    marker_name = "conda-meta"
+
+    HISTORY_CREATE_CMD_RE = re.compile(rb"^# cmd: .*\bcreate\b(?P<args>.*)$", re.MULTILINE)
+    HISTORY_PYTHON_PACKAGE_RE = re.compile(rb"^(?P<op>[+-])\S*::python-(?P<version>\d[^-\s]*)-", re.MULTILINE)
+
+    derived_attributes_caches: dict[Path, tuple[int, str, str]] = {}
+    """
+    Reading `conda-meta` is much cheaper than invoking `conda` but we still cache the result per prefix.
+    The value is `(conda_meta_mtime_ns, prompt, python_version)`.
+    """
+
     @property
     def conda_meta_path(self) -> Path:
         """The path of the `conda-meta` directory of the virtual environment."""
-        return self.venv_dir / "conda-meta"
+        return self.venv_dir / self.marker_name
+
+    @property
+    def marker_path(self) -> Path:
+        return self.conda_meta_path
 
     def is_valid(self) -> bool:
         try:
@@ -154,11 +179,37 @@ class CondaVenvInfo(BaseVenvInfo):
         except PermissionError:
             return False
 
-    def refresh_derived_attributes(self) -> None:
-        if not (conda_info := self.get_conda_info()):
+    @property
+    def conda_history_path(self) -> Path:
+        """The path of the `conda-meta/history` file of the virtual environment."""
+        return self.conda_meta_path / "history"
+
+    def refresh_derived_attributes(self, *, process_options: ProcessOptions | None = None) -> None:
+        try:
+            conda_meta_mtime = self.conda_meta_path.stat().st_mtime_ns
+        except OSError:
+            return
+
+        if (cached := self.derived_attributes_caches.get(self.venv_dir)) and cached[0] == conda_meta_mtime:
+            _, self.prompt, self.python_version = cached
+            return
+
+        history = self.read_history()
+        self.prompt = self.parse_env_name(history)
+        self.python_version = self.read_python_version_from_package_records() or self.parse_python_version(history)
+        if not self.python_version:
+            self.refresh_derived_attributes_by_conda_info(process_options)
+        self.derived_attributes_caches[self.venv_dir] = (conda_meta_mtime, self.prompt, self.python_version)
+
+    def refresh_derived_attributes_by_conda_info(self, process_options: ProcessOptions | None = None) -> None:
+        """The last resort, which is slow, to get the Python version by invoking `conda`."""
+        if not (conda_info := self.get_conda_info(process_options)):
+            return
+
+        # "python_version" is the one of the Python which runs `conda`, i.e., the one of the base environment.
+        if resolved_posix_path(conda_info.get("root_prefix", "")) != self.venv_dir.as_posix():
             return
 
-        self.prompt = conda_info.get("active_prefix_name", "")
         self.python_version = (
             conda_info
             .get("python_version", "")
@@ -168,10 +219,49 @@ class CondaVenvInfo(BaseVenvInfo):
             .partition(".final.")[0]
         )
 
+    def read_history(self) -> bytes:
+        try:
+            return self.conda_history_path.read_bytes()
+        except OSError:
+            return b""
+
+    def read_python_version_from_package_records(self) -> str:
+        """Reads the Python version from the package record, e.g., `conda-meta/python-3.12.4-h5148396_1.json`."""
+        for record_path in self.conda_meta_path.glob("python-[0-9]*.json"):
+            try:
+                record = json.loads(record_path.read_bytes())
+            except (OSError, ValueError):
+                continue
+            if isinstance(record, dict) and record.get("name") == "python" and (version := record.get("version")):
+                return str(version)
+        return ""
+
+    def parse_env_name(self, history: bytes) -> str:
+        """Guesses the environment name in the way `conda` shows it in the shell prompt."""
+        # only the base environment ships the "condabin" directory
+        if (self.venv_dir / "condabin").is_dir():
+            return "base"
+        # an environment created by a prefix, rather than a name, is shown as its full path
+        if (m := self.HISTORY_CREATE_CMD_RE.search(history)) and re.search(rb"\s(-p|--prefix)[\s=]", m["args"]):
+            return str(self.venv_dir)
+        return self.venv_dir.name
+
+    @classmethod
+    def parse_python_version(cls, history: bytes) -> str:
+        """Parses the Python version from the latest installation/removal of the `python` package in the history."""
+        python_version = ""
+        for m in cls.HISTORY_PYTHON_PACKAGE_RE.finditer(history):
+            version = m["version"].decode("utf-8")
+            if m["op"] == b"+":
+                python_version = version
+            elif version == python_version:
+                python_version = ""
+        return python_version
+
     @staticmethod
-    def get_conda_info() -> CondaInfoDict | None:
+    def get_conda_info(process_options: ProcessOptions | None = None) -> CondaInfoDict | None:
         """Get the Conda venv information."""
-        if not (output := run_shell_command("conda info --json")):
+        if not (output := run_process("conda info --json", options=process_options)):
             return None
         stdout, _, _ = output
 
@@ -184,10 +274,16 @@ class CondaVenvInfo(BaseVenvInfo):
 class Pep405VenvInfo(BaseVenvInfo):
     """Venv information for PEP 405 (https://peps.python.org/pep-0405/)"""
 
+    marker_name = "pyvenv.cfg"
+
     @property
     def pyvenv_cfg_path(self) -> Path:
         """The path of the `pyvenv.cfg` file of the virtual environment."""
-        return self.venv_dir / "pyvenv.cfg"
+        return self.venv_dir / self.marker_name
+
+    @property
+    def marker_path(self) -> Path:
+        return self.pyvenv_cfg_path
 
     def is_valid(self) -> bool:
         try:
@@ -195,7 +291,7 @@ class Pep405VenvInfo(BaseVenvInfo):
         except PermissionError:
             return False
 
-    def refresh_derived_attributes(self) -> None:
+    def refresh_derived_attributes(self, *, process_options: ProcessOptions | None = None) -> None:
         pyvenv_cfg = self.parse_pyvenv_cfg(self.pyvenv_cfg_path)
 
         self.prompt = pyvenv_cfg.get("prompt", "") or self.venv_dir.name
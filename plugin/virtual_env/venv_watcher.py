@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Sequence
+
+from LSP.plugin import Session
+
+from .helpers import calculate_finders_signature
+
+
+class VenvMarkerWatcher:
+    """
+    Watches what venv finders depend on (marker files, environment variables, executables) per project directory.
+
+    This is a polling watcher. Each poll only takes a few `stat` calls per finder and project directory,
+    which are compared with the snapshot taken by the previous poll. Polls may run in a worker thread.
+    """
+
+    def __init__(self) -> None:
+        self._snapshots: dict[Path, tuple[tuple[str, ...], str]] = {}
+        """Project directory => (finder names, signature)"""
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._snapshots)
+
+    def watch(self, project_dir: Path, finder_names: Sequence[str], *, session: Session) -> None:
+        """Starts watching the project directory. Does nothing if it's already watched with the same finders."""
+        finder_names = tuple(finder_names)
+        if (snapshot := self._snapshots.get(project_dir)) and snapshot[0] == finder_names:
+            return
+        signature = calculate_finders_signature(finder_names, session=session, project_dir=project_dir)
+        with self._lock:
+            self._snapshots[project_dir] = (finder_names, signature)
+
+    def unwatch(self, project_dir: Path) -> None:
+        with self._lock:
+            self._snapshots.pop(project_dir, None)
+
+    def poll(self, *, session: Session) -> list[Path]:
+        """Returns project directories whose signatures have changed since the previous poll."""
+        changed: list[Path] = []
+        with self._lock:
+            snapshots = tuple(self._snapshots.items())
+        for project_dir, snapshot in snapshots:
+            finder_names, signature = snapshot
+            new_signature = calculate_finders_signature(finder_names, session=session, project_dir=project_dir)
+            if new_signature == signature:
+                continue
+            with self._lock:
+                # the project directory may have been re-watched with other finders meanwhile
+                if self._snapshots.get(project_dir) != snapshot:
+                    continue
+                self._snapshots[project_dir] = (finder_names, new_signature)
+            changed.append(project_dir)
+        return changed
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Records hover and signature help responses from a pyright language server as fixtures of `tests/test_markdown.py`.
+
+Each fixture is `tests/files/markdown/<case>.json`, which contains the recorded response and the golden output,
+i.e., markdown values of the response patched by the reference implementation below, which applies rules one by one.
+
+Usage: python3 scripts/record_markdown_fixtures.py --langserver path/to/langserver.index.js [--server-name NAME]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Dict
+
+PROJECT_ROOT = Path(__file__).parents[1]
+FIXTURES_DIR = PROJECT_ROOT / "tests/files/markdown"
+SAMPLE_PATH = FIXTURES_DIR / "sample.py"
+
+# case name => (method, the prefix of the line, the text at the position, whether the position is after the text)
+CASES = {
+    "hover_builtin_function": ("textDocument/hover", "len(", "len", False),
+    "hover_rest_fields": ("textDocument/hover", 'request("GET"', "request", False),
+    "hover_class_with_fence": ("textDocument/hover", "Point(1", "Point", False),
+    "hover_class_argparse": ("textDocument/hover", "argparse.ArgumentParser", "ArgumentParser", False),
+    "hover_class_ordered_dict": ("textDocument/hover", "collections.OrderedDict", "OrderedDict", False),
+    "hover_function_subprocess_run": ("textDocument/hover", "subprocess.run", "run", False),
+    "hover_module_argparse": ("textDocument/hover", "import argparse", "argparse", False),
+    "hover_module_decimal": ("textDocument/hover", "import decimal", "decimal", False),
+    "hover_module_subprocess": ("textDocument/hover", "import subprocess", "subprocess", False),
+    "hover_module_typing": ("textDocument/hover", "import typing", "typing", False),
+    "signature_help_rest_fields": ("textDocument/signatureHelp", 'request("GET"', "request(", True),
+    "signature_help_subprocess_run": ("textDocument/signatureHelp", "subprocess.run", "run(", True),
+}
+
+JsonDict = Dict[str, Any]
+
+
+def reference_patch_markdown_content(content: str) -> str:
+    """The implementation which applies rules one by one, whose output is the golden one."""
+    content = re.sub("```python(?=\n)", "```pyright_python", content)
+    content = re.sub("```\n---", "```\n\n---", content)
+    content = re.sub(
+        r"\n:(\w+)[ \t]+([\w\\*.]+):",
+        lambda m: "\n__{field}:__ `{name}`".format(
+            field=m.group(1).title(),
+            name=m.group(2).replace(R"\_", "_").replace(R"\*", "*"),
+        ),
+        content,
+    )
+    content = re.sub(r"\n:returns?:", r"\n__Returns:__", content)
+    content = re.sub(r"\n:rtype:", r"\n__Returntype:__", content)
+    content = re.sub(r"\n:deprecated:", r"\n⚠️ __Deprecated:__", content)
+    return content
+
+
+def extract_markdown_values(method: str, result: Any) -> list[str]:
+    """Markdown values of a response in the order `tests/test_markdown.py` expects."""
+    values: list[str] = []
+    if method == "textDocument/hover":
+        contents = (result or {}).get("contents")
+        if isinstance(contents, dict) and contents.get("kind") == "markdown":
+            values.append(contents["value"])
+    elif method == "textDocument/signatureHelp":
+        for signature in (result or {}).get("signatures") or []:
+            for item in (signature, *(signature.get("parameters") or [])):
+                documentation = item.get("documentation")
+                if isinstance(documentation, dict) and documentation.get("kind") == "markdown":
+                    values.append(documentation["value"])
+    return values
+
+
+class LanguageServer:
+    """A minimal LSP client over stdio, which answers server requests with empty results."""
+
+    def __init__(self, command: list[str]) -> None:
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.next_id = 0
+
+    def notify(self, method: str, params: Any) -> None:
+        self._write({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def request(self, method: str, params: Any) -> Any:
+        self.next_id += 1
+        self._write({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params})
+        while True:
+            message = self._read()
+            if "method" in message and "id" in message:
+                is_configuration = message["method"] == "workspace/configuration"
+                result = [{} for _ in message["params"]["items"]] if is_configuration else None
+                self._write({"jsonrpc": "2.0", "id": message["id"], "result": result})
+            elif message.get("id") == self.next_id:
+                return message.get("result")
+
+    def close(self) -> None:
+        self.request("shutdown", None)
+        self.notify("exit", None)
+        self.process.wait(10)
+
+    def _write(self, message: JsonDict) -> None:
+        assert self.process.stdin
+        body = json.dumps(message).encode("utf-8")
+        self.process.stdin.write(b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        self.process.stdin.flush()
+
+    def _read(self) -> JsonDict:
+        assert self.process.stdout
+        headers: JsonDict = {}
+        while line := self.process.stdout.readline().strip():
+            name, _, value = line.decode("ascii").partition(":")
+            headers[name.lower()] = value.strip()
+        return json.loads(self.process.stdout.read(int(headers["content-length"])))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--langserver", required=True, help="The path of langserver.index.js")
+    parser.add_argument("--server-name", default="pyright", help="The server name which is recorded in fixtures")
+    args = parser.parse_args()
+
+    sample_uri = SAMPLE_PATH.resolve().as_uri()
+    sample_lines = SAMPLE_PATH.read_text(encoding="utf-8").splitlines()
+    server = LanguageServer(["node", args.langserver, "--stdio"])
+    server.request(
+        "initialize",
+        {
+            "processId": None,
+            "rootUri": FIXTURES_DIR.resolve().as_uri(),
+            "capabilities": {
+                "textDocument": {
+                    "hover": {"contentFormat": ["markdown", "plaintext"]},
+                    "signatureHelp": {"signatureInformation": {"documentationFormat": ["markdown", "plaintext"]}},
+                },
+                "workspace": {"configuration": True},
+            },
+        },
+    )
+    server.notify("initialized", {})
+    server.notify(
+        "textDocument/didOpen",
+        {"textDocument": {"uri": sample_uri, "languageId": "python", "version": 1, "text": "\n".join(sample_lines)}},
+    )
+    try:
+        for case, (method, line_prefix, text, is_after) in CASES.items():
+            line = next(i for i, line in enumerate(sample_lines) if line.startswith(line_prefix))
+            character = sample_lines[line].index(text) + (len(text) if is_after else 0)
+            params = {"textDocument": {"uri": sample_uri}, "position": {"line": line, "character": character}}
+            result = server.request(method, params)
+            if not (values := extract_markdown_values(method, result)):
+                raise RuntimeError(f"No markdown content is recorded for case: {case}")
+            fixture = {
+                "server": args.server_name,
+                "method": method,
+                "result": result,
+                "golden": [reference_patch_markdown_content(value) for value in values],
+            }
+            fixture_path = FIXTURES_DIR / f"{case}.json"
+            fixture_path.write_text(json.dumps(fixture, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+            print(f"Recorded: {fixture_path.relative_to(PROJECT_ROOT)}")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
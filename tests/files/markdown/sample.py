@@ -0,0 +1,49 @@
+import argparse
+import collections
+import decimal
+import subprocess
+import typing
+
+
+def request(method: str, url: str, **kwargs: object) -> dict:
+    """
+    Send a request to the server.
+
+    :param method: The HTTP method, e.g., ``GET``.
+    :param url: The URL of the \\_resource\\_.
+    :type url: str
+    :param \\*\\*kwargs: Optional arguments that ``request`` takes.
+    :returns: The response object.
+    :rtype: dict
+    :raises ValueError: If the URL is invalid.
+    :deprecated: Use ``Session.request`` instead.
+    """
+    return {}
+
+
+class Point:
+    """A point in 2D space.
+
+    Example:
+
+    ```python
+    p = Point(1, 2)
+    ```
+    ---
+    :param x: The x coordinate.
+    :param y: The y coordinate.
+    """
+
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+
+len([])
+request("GET", "https://example.com")
+Point(1, 2)
+argparse.ArgumentParser()
+collections.OrderedDict()
+decimal.Decimal("1.0")
+subprocess.run(["ls"])
+typing.NamedTuple
@@ -0,0 +1,130 @@
+"""
+Golden output tests of `plugin/markdown.py` against responses recorded from the language server.
+
+Fixtures are recorded by `scripts/record_markdown_fixtures.py`.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import unittest
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).parents[1]
+FIXTURES_DIR = PROJECT_ROOT / "tests/files/markdown"
+
+
+def load_module(name: str, path: Path) -> ModuleType:
+    """Loads a module from the file without importing the `plugin` package, which requires Sublime Text."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def extract_markdown_values(method: str, result: Any) -> list[str]:
+    values: list[str] = []
+    if method == "textDocument/hover":
+        contents = (result or {}).get("contents")
+        if isinstance(contents, dict) and contents.get("kind") == "markdown":
+            values.append(contents["value"])
+    elif method == "textDocument/signatureHelp":
+        for signature in (result or {}).get("signatures") or []:
+            for item in (signature, *(signature.get("parameters") or [])):
+                documentation = item.get("documentation")
+                if isinstance(documentation, dict) and documentation.get("kind") == "markdown":
+                    values.append(documentation["value"])
+    return values
+
+
+markdown = load_module("markdown", PROJECT_ROOT / "plugin/markdown.py")
+
+
+class TestGoldenOutput(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fixtures = {
+            path.stem: json.loads(path.read_text(encoding="utf-8")) for path in sorted(FIXTURES_DIR.glob("*.json"))
+        }
+        self.assertTrue(self.fixtures, f"No fixture is found in {FIXTURES_DIR}")
+
+    def test_patch_markdown_content(self) -> None:
+        for name, fixture in self.fixtures.items():
+            with self.subTest(fixture=name):
+                values = extract_markdown_values(fixture["method"], fixture["result"])
+                self.assertEqual([markdown.patch_markdown_content(value) for value in values], fixture["golden"])
+
+    def test_markdown_cache(self) -> None:
+        cache = markdown.MarkdownCache()
+        for _ in range(2):  # the second round is served from the cache
+            for name, fixture in self.fixtures.items():
+                with self.subTest(fixture=name):
+                    values = extract_markdown_values(fixture["method"], fixture["result"])
+                    self.assertEqual([cache.patch(value) for value in values], fixture["golden"])
+        self.assertGreater(cache.hits, 0)
+
+    def test_patch_documentation_without_size_limit(self) -> None:
+        for name, fixture in self.fixtures.items():
+            with self.subTest(fixture=name):
+                values = extract_markdown_values(fixture["method"], fixture["result"])
+                self.assertEqual([markdown.patch_documentation(value) for value in values], fixture["golden"])
+
+
+class TestTruncateMarkdownContent(unittest.TestCase):
+    SIZE_LIMIT = 20000
+
+    def truncate(self, content: str) -> str:
+        return markdown.truncate_markdown_content(content, self.SIZE_LIMIT)
+
+    def assert_fences_balanced(self, content: str) -> None:
+        fences = [line for line in content.splitlines() if line.lstrip().startswith("```")]
+        self.assertEqual(len(fences) % 2, 0, f"Unbalanced fences: {fences}")
+
+    def test_short_content(self) -> None:
+        content = "```python\ndef f() -> None\n```\n---\nDocumentation.\n"
+        self.assertEqual(self.truncate(content), content)
+
+    def test_long_first_line(self) -> None:
+        for content in ("x" * 50000, "\n" + "x" * 50000):
+            with self.subTest(content=content[:10]):
+                self.assertEqual(self.truncate(content), content[: self.SIZE_LIMIT])
+
+    def test_long_line_after_short_header(self) -> None:
+        header = "```python\ndef f() -> None\n```\n---\n"
+        result = self.truncate(header + "x" * 50000)
+        self.assertTrue(result.startswith(header))
+        self.assertEqual(len(result), self.SIZE_LIMIT)
+        self.assert_fences_balanced(result)
+
+    def test_paragraph_boundary(self) -> None:
+        paragraph = "y" * 100 + "\n\n"
+        result = self.truncate(paragraph * 500)
+        self.assertGreaterEqual(len(result), self.SIZE_LIMIT // 2)
+        self.assertLessEqual(len(result), self.SIZE_LIMIT)
+        self.assertTrue(result.endswith("\n\n"))
+
+    def test_oversized_fence(self) -> None:
+        for header in ("", "Header\n\n"):
+            with self.subTest(header=header):
+                result = self.truncate(header + "```python\n" + "a = 1\n" * 10000 + "```\n")
+                self.assertTrue(result.startswith(header + "```python\na = 1\n"))
+                self.assertGreaterEqual(len(result), self.SIZE_LIMIT // 2)
+                self.assertTrue(result.endswith("a = 1\n```\n"))
+                self.assert_fences_balanced(result)
+
+    def test_fences_balanced_after_cut(self) -> None:
+        blocks = ("```python\n" + "b = 2\n" * 50 + "```\n", "z" * 3000 + "\n", "\n", "```\n" + "c" * 30000)
+        for i in range(len(blocks) ** 3):
+            parts = [blocks[(i // len(blocks) ** k) % len(blocks)] for k in range(3)]
+            content = "".join(parts) * 10
+            with self.subTest(parts=[part[:10] for part in parts]):
+                result = self.truncate(content)
+                self.assert_fences_balanced(result)
+                self.assertGreaterEqual(len(result), min(len(content), self.SIZE_LIMIT // 2))
+
+
+if __name__ == "__main__":
+    unittest.main()